@@ -0,0 +1,22 @@
+# automation/atomic_file.py
+import json, os, threading
+from pathlib import Path
+
+def write_text(path: Path, text: str):
+    """
+    Replace `path` in one step: write a sibling temp file, then rename it over
+    the target, so a crash mid-write or a concurrent reader never sees half a
+    file. The temp name is unique per process and thread.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def write_json(path: Path, data, **dumps_kwargs):
+    write_text(path, json.dumps(data, **dumps_kwargs))
@@ -1,9 +1,15 @@
-import os, json
+import argparse, itertools, os, json, time
 from pathlib import Path
 from .scraper_core import scrape_from_config, write_csv, upload_csv
 from .discovery import discover_companies, write_company_config
+from .run_journal import RunJournal, target_key
+from .dedup import Deduplicator
+from .run_report import RunReport
+from .scheduler import Scheduler
+from .delta import build_snapshot, compute_delta, load_snapshot, save_snapshot, snapshot_digest, upload_delta
 
 UPLOAD_URL = "https://career-scraper-backend.onrender.com/upload"
+DELTA_URL = UPLOAD_URL + "/delta"
 
 # Keyword input file (optional). If absent, we fall back to hardcoded defaults.
 KEYWORDS_PATH = Path(__file__).parent / "keywords.json"
@@ -14,35 +20,129 @@ DEFAULT_KEYWORDS = {
     "states": ["MI", "IN"]  # tweak as needed, or leave empty to search broadly
 }
 
-def main():
-    # 1) Load keywords
-    if KEYWORDS_PATH.exists():
-        kw_cfg = json.loads(KEYWORDS_PATH.read_text(encoding="utf-8"))
+def sync_delta(current) -> bool:
+    """Try a delta upload against the last uploaded snapshot. False means: do a full upload."""
+    previous = load_snapshot()
+    if not previous:
+        return False
+    upserts, deletes = compute_delta(previous["jobs"], current)
+    print(f"[UPLOAD] Delta: {len(upserts)} upserts, {len(deletes)} deletes ({len(current)} jobs)")
+    if not upserts and not deletes:
+        # Posting nothing would still record a new upload and change the dashboards' ETag
+        print("[UPLOAD] Nothing changed since the last upload; skipping it")
+        return True
+    resp = upload_delta(DELTA_URL, previous["digest"], upserts, deletes, snapshot_digest(current))
+    if resp.status_code == 409:
+        print("[UPLOAD] Backend snapshot differs from ours; falling back to a full upload")
+        return False
+    if not resp.ok:
+        # e.g. 404/405 from a backend without /upload/delta; the full CSV always works
+        print(f"[UPLOAD] Delta upload failed with HTTP {resp.status_code}; falling back to a full upload")
+        return False
+    print("[UPLOAD] Delta response:", resp.text)
+    return True
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Discover career pages, scrape them and upload the results.")
+    p.add_argument("--max-age-hours", type=float, default=os.getenv("SCRAPER_MAX_AGE_HOURS"),
+                   help="Only re-scrape targets whose last successful scrape is older than this; reuse the rest.")
+    p.add_argument("--fresh", action="store_true",
+                   help="Ignore an unfinished previous run instead of resuming it.")
+    p.add_argument("--all-targets", action="store_true",
+                   help="Scrape every target, not just those the schedule says are due.")
+    return p.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    journal = RunJournal()
+    resuming = journal.begin(fresh=args.fresh)
+    report = RunReport()
+    try:
+        run(args, journal, resuming, report)
+    finally:
+        # Written even when the run fails part-way: that's when it's most useful
+        report.write()
+
+def run(args, journal, resuming, report):
+    # Only trust company_config.json if the interrupted run got as far as writing it
+    if resuming and COMPANY_CONFIG_PATH.exists() and COMPANY_CONFIG_PATH.stat().st_mtime >= journal.started_at:
+        # Pick up the interrupted run with the targets it had already discovered
+        discovered = json.loads(COMPANY_CONFIG_PATH.read_text(encoding="utf-8"))
+        print(f"[RESUME] Resuming run started {time.ctime(journal.started_at)} with {len(discovered)} targets")
     else:
-        kw_cfg = DEFAULT_KEYWORDS
+        # 1) Load keywords
+        if KEYWORDS_PATH.exists():
+            kw_cfg = json.loads(KEYWORDS_PATH.read_text(encoding="utf-8"))
+        else:
+            kw_cfg = DEFAULT_KEYWORDS
+
+        keywords = kw_cfg.get("keywords", [])
+        states = kw_cfg.get("states", [])
 
-    keywords = kw_cfg.get("keywords", [])
-    states = kw_cfg.get("states", [])
+        # 2) Discover targets via search API
+        with report.stage("discovery"):
+            discovered = discover_companies(keywords, states, max_per_query=20)
 
-    # 2) Discover targets via search API
-    discovered = discover_companies(keywords, states, max_per_query=20)
+        # 3) Write to company_config.json (so you can inspect)
+        write_company_config(discovered, str(COMPANY_CONFIG_PATH))
+        print(f"[DISCOVERY] Wrote {len(discovered)} targets to {COMPANY_CONFIG_PATH}")
+    report.count("targets", len(discovered))
 
-    # 3) Write to company_config.json (so you can inspect)
-    write_company_config(discovered, str(COMPANY_CONFIG_PATH))
-    print(f"[DISCOVERY] Wrote {len(discovered)} targets to {COMPANY_CONFIG_PATH}")
+    # 4) Scrape using discovered config, skipping targets already checkpointed
+    reused, todo = journal.split(discovered, max_age_hours=args.max_age_hours)
+    if reused:
+        print(f"[SCRAPER] Reusing {len(reused)} checkpointed targets, scraping {len(todo)}")
+    report.count("targets_reused", len(reused))
+    # Targets that rarely change are revisited less often; until they're due their last rows stand in.
+    # A failing target with nothing checkpointed sits out its backoff with no rows.
+    scheduler = Scheduler()
+    if not args.all_targets:
+        todo, later = scheduler.plan(discovered, todo)
+        for i in later:
+            rows = journal.rows(discovered[i])
+            if rows is not None:
+                reused[i] = rows
+            elif not scheduler.backing_off(discovered[i]):
+                todo.append(i)
+        todo.sort()
+        report.count("targets_deferred", len(discovered) - len(todo) - report.counts["targets_reused"])
+    scraped = {}
+    def checkpoint(entry, rows, error):
+        journal.record(entry, rows, error)
+        scheduler.record(entry, rows, error)
+        scraped[target_key(entry)] = rows
+    # Dedup runs below, once checkpointed and fresh rows are merged
+    targets = [discovered[i] for i in todo]
+    with report.stage("scrape"):
+        scrape_from_config(targets, on_result=checkpoint, dedupe=False, report=report)
+    scheduler.record_costs(targets, report)
+    scheduler.save(journal.started_at)
 
-    # 4) Scrape using discovered config
-    rows = scrape_from_config(discovered)
+    with report.stage("dedup"):
+        deduper = Deduplicator()
+        rows = list(deduper.filter(itertools.chain.from_iterable(
+            reused[i] if i in reused else scraped.get(target_key(entry), []) for i, entry in enumerate(discovered))))
+        deduper.report()
+    report.count("rows", deduper.kept)
+    report.count("duplicates_dropped", deduper.dropped)
     out_path = Path("scraped_jobs.csv")
     write_csv(rows, out_path)
     print(f"[SCRAPER] Wrote {out_path} with {len(rows)} rows. Uploading to dashboard...")
 
-    # 5) Upload to backend
+    # 5) Upload to backend: just the changes when we know what it already has, else the full CSV
+    current = build_snapshot(rows)
     try:
-        resp = upload_csv(out_path, UPLOAD_URL)
-        print("[UPLOAD] Upload response:", resp)
+        with report.stage("upload"):
+            if not sync_delta(current):
+                resp = upload_csv(out_path, UPLOAD_URL)
+                print("[UPLOAD] Upload response:", resp)
+        save_snapshot(current)
     except Exception as e:
+        # Leave the run open: the next invocation resumes from the checkpoints and retries the upload
         print("[UPLOAD] Failed:", e)
+        return
+
+    journal.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,118 @@
+# automation/dedup.py
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator
+
+from .locations import normalize_location
+
+# Query parameters that only say where a click came from, never which job it is
+TRACKING_PARAMS = frozenset([
+    "gh_src", "lever-source", "lever-origin", "source", "src", "ref", "referrer", "trk",
+    "fbclid", "gclid", "msclkid", "mc_cid", "mc_eid", "_hsenc", "_hsmi",
+])
+_WORDS = re.compile(r"[^\w]+")
+_COMPANY_SUFFIX = re.compile(r"\s+(?:inc|llc|ltd|corp|corporation|co|company|plc|lp)$")
+# discovery labels targets "Acme Events (Greenhouse)" (from the board slug) or "www.acme.com (Generic)"
+_SOURCE_LABEL = re.compile(r"\s*\((?:greenhouse|lever|generic)\)\s*$", re.I)
+_HOST = re.compile(r"^[a-z0-9-]+(?:\.[a-z0-9-]+)+$", re.I)
+_HOST_PREFIXES = frozenset(["www", "careers", "jobs", "boards", "apply"])
+_SECOND_LEVEL = frozenset(["co", "com", "org", "net", "ac", "gov"])  # acme.co.uk
+
+_URL = re.compile(r"^[a-z][a-z0-9+.-]*://(?:www\.)?([^/?#]*)([^?#]*)(?:\?([^#]*))?", re.I)
+
+def _tracking(param: str) -> bool:
+    name = param.split("=", 1)[0].lower()
+    return name in TRACKING_PARAMS or name.startswith("utm_")
+
+@lru_cache(maxsize=65536)
+def canonical_url(url: str) -> str:
+    """Scheme, host case, www., fragment, trailing slash and tracking params don't make a new posting."""
+    url = (url or "").strip()
+    m = _URL.match(url)
+    if not m:
+        return url
+    host, path, query = m.groups()
+    url = f"https://{host.lower()}{path.rstrip('/') or '/'}"
+    if query:
+        params = sorted(p for p in query.split("&") if p and not _tracking(p))
+        if params:
+            url += "?" + "&".join(params)
+    return url
+
+def _norm(text: str) -> str:
+    # Runs of punctuation/whitespace become one space
+    return _WORDS.sub(" ", (text or "").casefold()).strip()
+
+def _host_base(host: str) -> str:
+    """www.acme.com / careers.acme.co.uk -> acme"""
+    labels = [l for l in host.lower().split(".") if l not in _HOST_PREFIXES]
+    if len(labels) > 1:
+        labels.pop()  # TLD
+        if len(labels) > 1 and labels[-1] in _SECOND_LEVEL:
+            labels.pop()
+    return labels[-1] if labels else host
+
+@lru_cache(maxsize=16384)
+def _company(name: str) -> str:
+    """
+    Company identity across sources: "Acme Events (Greenhouse)", "www.acmeevents.com (Generic)"
+    and "Acme Events, Inc." all become "acmeevents".
+    """
+    name = _SOURCE_LABEL.sub("", name or "").strip()
+    if _HOST.match(name):
+        name = _host_base(name)
+    return _COMPANY_SUFFIX.sub("", _norm(name)).replace(" ", "").replace("_", "")
+
+@lru_cache(maxsize=65536)
+def _place(location: str, state: str) -> str:
+    loc = normalize_location(location)
+    return f"{_norm(loc.city)}|{loc.state or state.upper()}|{int(loc.remote)}"
+
+def content_key(row: Dict, title: str = None, place: str = None) -> str:
+    """Company, title and location with case, punctuation, whitespace and legal suffixes normalised."""
+    if title is None:
+        title = _norm(row.get("title"))
+    if place is None:
+        place = _place(row.get("location") or "", row.get("state") or "")
+    return "\x1f".join([_company(row.get("company") or ""), title, place])
+
+class Deduplicator:
+    """
+    Single streaming pass that drops a row when either its normalised
+    company/title/location or its canonical source_url/title/location was
+    already seen. The second key catches one posting listed under two
+    spellings of the company; generic pages share one source_url across all
+    their jobs, so the URL alone can't be the key.
+    Only 64-bit hashes of the keys are kept (Python's own string hash: the
+    sets never leave the process, and a collision among a few million rows is
+    vanishingly unlikely); the first occurrence (config order) survives.
+    """
+
+    def __init__(self):
+        self.seen_content = set()
+        self.seen_urls = set()
+        self.kept = 0
+        self.dropped = 0
+
+    def is_new(self, row: Dict) -> bool:
+        title = _norm(row.get("title"))
+        place = _place(row.get("location") or "", row.get("state") or "")
+        content = hash(content_key(row, title, place))
+        url = canonical_url(row.get("source_url") or "")
+        url_hash = hash((url, title, place)) if url else None
+        if content in self.seen_content or (url_hash is not None and url_hash in self.seen_urls):
+            self.dropped += 1
+            return False
+        self.seen_content.add(content)
+        if url_hash is not None:
+            self.seen_urls.add(url_hash)
+        self.kept += 1
+        return True
+
+    def filter(self, rows: Iterable[Dict]) -> Iterator[Dict]:
+        for row in rows:
+            if self.is_new(row):
+                yield row
+
+    def report(self):
+        print(f"[DEDUP] Kept {self.kept} rows, dropped {self.dropped} duplicates")
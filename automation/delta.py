@@ -0,0 +1,57 @@
+# automation/delta.py
+import hashlib, json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import atomic_file, http_client
+from .run_journal import STATE_DIR
+
+SNAPSHOT_PATH = STATE_DIR / "last_upload.json"
+ROW_FIELDS = ["company", "title", "location", "state", "source_url"]
+
+def normalize_title(title: str) -> str:
+    return " ".join((title or "").lower().split())
+
+def job_fingerprint(row: Dict) -> str:
+    """
+    Stable identity of a posting: company, normalised title, location and
+    source_url. backend/job_store.py (fingerprint) must compute the same value.
+    """
+    key = "\x1f".join([
+        (row.get("company") or "").strip().lower(),
+        normalize_title(row.get("title")),
+        " ".join((row.get("location") or "").lower().split()),
+        (row.get("source_url") or "").strip(),
+    ])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def snapshot_digest(fingerprints) -> str:
+    """Order-independent digest of a set of fingerprints (XOR); matches the backend's."""
+    acc = 0
+    for fp in set(fingerprints):
+        acc ^= int(fp, 16)
+    return f"{acc:016x}"
+
+def build_snapshot(rows: List[Dict]) -> Dict[str, Dict]:
+    # What the backend will hold after ingesting these rows: fingerprint -> row (last one wins)
+    return {job_fingerprint(r): {f: (r.get(f) or "").strip() for f in ROW_FIELDS} for r in rows}
+
+def load_snapshot(path: Path = SNAPSHOT_PATH) -> Optional[Dict]:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def save_snapshot(jobs: Dict[str, Dict], path: Path = SNAPSHOT_PATH):
+    atomic_file.write_json(path, {"digest": snapshot_digest(jobs), "jobs": jobs})
+
+def compute_delta(previous: Dict[str, Dict], current: Dict[str, Dict]) -> Tuple[List[Dict], List[str]]:
+    """(upserts, deletes): rows that are new or changed, and fingerprints that disappeared."""
+    upserts = [row for fp, row in current.items() if previous.get(fp) != row]
+    deletes = [fp for fp in previous if fp not in current]
+    return upserts, deletes
+
+def upload_delta(delta_url: str, base: str, upserts: List[Dict], deletes: List[str], result: str):
+    """POST the delta; returns the response (409 = snapshots disagree, send the full CSV instead)."""
+    payload = {"base": base, "upserts": upserts, "deletes": deletes, "result": result}
+    return http_client.get_session().post(delta_url, json=payload, timeout=120)
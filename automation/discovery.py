@@ -1,12 +1,24 @@
 # automation/discovery.py
-import os, re, json, time
-from typing import List, Dict
-import requests
+import os, re, json, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Dict, Optional
+
+from . import atomic_file, http_client
+from .throttle import TokenBucket
 
 # === CONFIG ===
-BING_ENDPOINT = "https://api.bing.microsoft.com/v7.0/search"
+BING_ENDPOINT = os.getenv("BING_ENDPOINT", "https://api.bing.microsoft.com/v7.0/search")  # point at a stub for tests/benchmarks
 BING_KEY = os.getenv("BING_API_KEY")  # set in Render Cron Job environment
 
+SEARCH_QPS = float(os.getenv("DISCOVERY_QPS", "3"))            # Bing's free tier allows 3 transactions/second
+SEARCH_CONCURRENCY = int(os.getenv("DISCOVERY_CONCURRENCY", "4"))
+SEARCH_CACHE_PATH = Path(os.getenv("DISCOVERY_CACHE_PATH", Path(__file__).parent / ".cache" / "search_cache.json"))
+SEARCH_CACHE_TTL_HOURS = float(os.getenv("DISCOVERY_CACHE_TTL_HOURS", "72"))
+
+# A search backend takes (query, count) and returns [{"name", "url", "snippet"}, ...]
+SearchFn = Callable[[str, int], List[Dict]]
+
 # Recognize common ATS domains
 ATS_PATTERNS = [
     (re.compile(r"https?://boards\.greenhouse\.io/([^/?#]+)"), "greenhouse"),
@@ -18,13 +30,58 @@ def _bing_search(query: str, count: int = 20, market: str = "en-US") -> List[Dic
         raise RuntimeError("BING_API_KEY environment variable not set")
     headers = {"Ocp-Apim-Subscription-Key": BING_KEY}
     params = {"q": query, "mkt": market, "count": count, "responseFilter": "Webpages"}
-    r = requests.get(BING_ENDPOINT, headers=headers, params=params, timeout=20)
+    r = http_client.get(BING_ENDPOINT, headers=headers, params=params, timeout=20)
     r.raise_for_status()
     data = r.json()
     items = data.get("webPages", {}).get("value", []) if isinstance(data, dict) else []
     # Normalize: title, url, snippet
     return [{"name": i.get("name",""), "url": i.get("url",""), "snippet": i.get("snippet","")} for i in items]
 
+# Backends selectable by name via DISCOVERY_BACKEND
+SEARCH_BACKENDS: Dict[str, SearchFn] = {
+    "bing": _bing_search,
+}
+
+def _backend_key(search: SearchFn) -> str:
+    """Names the backend in cache keys (bing with its endpoint), so a stub's results never pass for real ones."""
+    name = next((n for n, fn in SEARCH_BACKENDS.items() if fn is search), None)
+    if name is None:
+        return f"{getattr(search, '__module__', '')}.{getattr(search, '__qualname__', repr(search))}"
+    return f"{name}@{BING_ENDPOINT}" if name == "bing" else name
+
+class QueryCache:
+    """
+    Persistent search-result cache: one JSON file mapping query -> results.
+    Entries older than `ttl_hours` are ignored and pruned on save.
+    """
+
+    def __init__(self, path: Path = SEARCH_CACHE_PATH, ttl_hours: float = SEARCH_CACHE_TTL_HOURS):
+        self.path = Path(path)
+        self.ttl = ttl_hours * 3600
+        self._lock = threading.Lock()
+        try:
+            self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.time() - entry["stored_at"] <= self.ttl:
+            return entry["results"]
+        return None
+
+    def put(self, key: str, results: List[Dict]):
+        with self._lock:
+            self._entries[key] = {"stored_at": time.time(), "results": results}
+
+    def save(self):
+        now = time.time()
+        with self._lock:
+            self._entries = {k: v for k, v in self._entries.items() if now - v["stored_at"] <= self.ttl}
+            data = json.dumps(self._entries)
+        atomic_file.write_text(self.path, data)
+
 def _classify_url(url: str) -> Dict:
     # Try ATS first
     for rx, typ in ATS_PATTERNS:
@@ -37,12 +94,20 @@ def _classify_url(url: str) -> Dict:
         return {"type": "generic", "url": url}
     return {"type": "unknown", "url": url}
 
-def discover_companies(keywords: List[str], states: List[str] = None, max_per_query: int = 20) -> List[Dict]:
+def discover_companies(keywords: List[str], states: List[str] = None, max_per_query: int = 20,
+                       search: Optional[SearchFn] = None, cache: Optional[QueryCache] = None,
+                       concurrency: int = SEARCH_CONCURRENCY, qps: float = SEARCH_QPS) -> List[Dict]:
     """
     Returns a list of scraper config entries: {company, type, url, ...}
     Heuristic: run queries, classify URLs, collapse duplicates.
+
+    Queries run `concurrency` at a time under a `qps` token bucket; results
+    younger than the cache TTL are reused without calling the backend.
+    `search` defaults to the DISCOVERY_BACKEND backend (bing).
     """
     states = states or []
+    search = search or SEARCH_BACKENDS[os.getenv("DISCOVERY_BACKEND", "bing")]
+    cache = cache if cache is not None else QueryCache()
     seen = set()
     out: List[Dict] = []
     queries = []
@@ -65,14 +130,29 @@ def discover_companies(keywords: List[str], states: List[str] = None, max_per_qu
             for pat in base_patterns:
                 queries.append(pat.format(kw=kw))
 
-    # Execute
-    for q in queries:
+    bucket = TokenBucket(qps)
+    backend = _backend_key(search)
+
+    def run(q):
+        key = f"{backend}|{q}|{max_per_query}"
+        results = cache.get(key)
+        if results is not None:
+            return results
+        bucket.acquire()  # be polite to the API
         try:
-            results = _bing_search(q, count=max_per_query)
+            results = search(q, max_per_query)
         except Exception as e:
             print("[DISCOVERY] Search failed for query:", q, e)
-            continue
+            return []
+        cache.put(key, results)
+        return results
 
+    # Execute (results are consumed in query order, so the output stays deterministic)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        all_results = list(pool.map(run, queries))
+    cache.save()
+
+    for results in all_results:
         for item in results:
             url = item["url"]
             cls = _classify_url(url)
@@ -96,8 +176,6 @@ def discover_companies(keywords: List[str], states: List[str] = None, max_per_qu
             entry = {"company": company_label, "type": cls["type"], "url": cls["url"]}
             out.append(entry)
 
-        time.sleep(0.8)  # be polite to the API
-
     # Deduplicate by (type, url)
     dedup = []
     seen2 = set()
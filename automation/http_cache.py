@@ -0,0 +1,88 @@
+# automation/http_cache.py
+import hashlib, json, os, threading, time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import atomic_file
+
+CACHE_DIR = Path(os.getenv("SCRAPER_CACHE_DIR", Path(__file__).parent / ".cache" / "http"))
+CACHE_TTL_HOURS = float(os.getenv("SCRAPER_CACHE_TTL_HOURS", "168"))   # a week
+CACHE_MAX_MB = float(os.getenv("SCRAPER_CACHE_MAX_MB", "200"))
+
+class ResponseCache:
+    """
+    On-disk cache of extracted job rows, one small JSON file per URL.
+
+    Each entry keeps the validators (ETag / Last-Modified) and a hash of the
+    body it was parsed from, so the next run can send a conditional GET and,
+    on a 304 or an identical body, reuse the rows without parsing anything.
+    `parse_key` identifies how the rows were extracted (adapter + selectors);
+    rows from a different parse_key are never reused.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR, ttl_hours: float = CACHE_TTL_HOURS, max_mb: float = CACHE_MAX_MB):
+        self.directory = Path(directory)
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> Path:
+        return self.directory / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str, parse_key: str) -> Optional[Dict]:
+        path = self._path(url)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or entry.get("parse_key") != parse_key:
+            return None
+        if time.time() - entry.get("stored_at", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, parse_key: str, rows: List[Dict], body_hash: str = "", etag: str = "", last_modified: str = ""):
+        entry = {
+            "url": url,
+            "parse_key": parse_key,
+            "etag": etag or "",
+            "last_modified": last_modified or "",
+            "body_hash": body_hash,
+            "stored_at": time.time(),
+            "rows": rows,
+        }
+        atomic_file.write_json(self._path(url), entry)
+
+    def evict(self):
+        """Drop expired entries, then the least recently stored ones until under max size."""
+        with self._lock:
+            if not self.directory.exists():
+                return
+            now = time.time()
+            files = []
+            for p in self.directory.glob("*.json"):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                if now - st.st_mtime > self.ttl:
+                    p.unlink(missing_ok=True)
+                else:
+                    files.append((st.st_mtime, st.st_size, p))
+            total = sum(size for _, size, _ in files)
+            for _, size, p in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
@@ -0,0 +1,221 @@
+# automation/http_client.py
+import os, socket, threading, time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+
+# urllib3 decodes "br" transparently when the optional brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "CareerScraperBot/1.0 (+contact: ops@example.com)",
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+# Tunables; each can be overridden from the environment (e.g. in the Render cron job)
+SETTINGS = {
+    "timeout": float(os.getenv("SCRAPER_HTTP_TIMEOUT", "15")),
+    "retries": int(os.getenv("SCRAPER_HTTP_RETRIES", "3")),
+    "backoff": float(os.getenv("SCRAPER_HTTP_BACKOFF", "0.5")),        # 0.5s, 1s, 2s, ...
+    "max_retry_after": float(os.getenv("SCRAPER_HTTP_MAX_RETRY_AFTER", "60")),
+    "pool_size": int(os.getenv("SCRAPER_HTTP_POOL_SIZE", "16")),       # keep-alive sockets per host
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_lock = threading.Lock()
+
+# One entry per request (see _TimedAdapter.send), drained into the run report
+request_log: deque = deque(maxlen=100_000)
+_local = threading.local()
+
+class _Retry(Retry):
+    """Retry that honours Retry-After on 429/503, but never sleeps longer than max_retry_after."""
+
+    def __init__(self, *args, max_retry_after: float = 60.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kw):
+        # increment() hands urllib3 a fresh copy to sleep with; the cap has to come along
+        kw.setdefault("max_retry_after", self.max_retry_after)
+        return super().new(**kw)
+
+    def get_retry_after(self, response):
+        seconds = super().get_retry_after(response)
+        if seconds is None:
+            return None
+        return min(seconds, self.max_retry_after)
+
+class _TimingMixin:
+    """Adds DNS and connect (TCP + TLS) time of each new socket to the current request's timings."""
+
+    def connect(self):
+        timings = getattr(_local, "timings", None)
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            if timings is not None:
+                timings["connects"] += 1
+                timings["connect"] += time.perf_counter() - started - timings.pop("_dns", 0.0)
+
+    def _new_conn(self):
+        timings = getattr(_local, "timings", None)
+        if timings is None:
+            return super()._new_conn()
+        # Resolve here so the lookup can be timed on its own, then try each address in turn like
+        # urllib3's create_connection would (same family preference, IPv6 -> IPv4 fallback).
+        # TLS still verifies and sends SNI for self.host.
+        started = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            infos = []  # let urllib3 look it up again and report the error against the host name
+        dns = time.perf_counter() - started
+        timings["dns"] += dns
+        timings["_dns"] = timings.get("_dns", 0.0) + dns  # connect() takes it back out
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if not addresses:
+            return super()._new_conn()
+        host = self._dns_host
+        try:
+            for n, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError:  # NewConnectionError too
+                    if n == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+
+class _TimedHTTPConnection(_TimingMixin, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_TimingMixin, HTTPSConnection):
+    pass
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class _TimedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that logs every request to request_log: dns, connect (both 0
+    on a reused keep-alive socket), ttfb (request sent -> response headers,
+    including any retries), download (body read), bytes, status and retries.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
+
+    def send(self, request, stream=False, **kwargs):
+        timings = {"dns": 0.0, "connect": 0.0, "connects": 0}
+        entry = {"url": request.url, "label": getattr(_local, "label", None), "status": None, "error": None}
+        _local.timings = timings
+        started = time.perf_counter()
+        try:
+            resp = super().send(request, stream=stream, **kwargs)
+            headers_at = time.perf_counter()
+            if not stream:
+                resp.content  # read the body here so its time is attributed to download
+            finished = time.perf_counter()
+        except Exception as e:
+            entry.update(error=type(e).__name__, total=time.perf_counter() - started, **_phases(timings))
+            request_log.append(entry)
+            raise
+        finally:
+            _local.timings = None
+        retries = getattr(resp.raw, "retries", None)
+        entry.update(
+            status=resp.status_code,
+            ttfb=headers_at - started - timings["dns"] - timings["connect"],
+            download=finished - headers_at if not stream else None,
+            total=finished - started,
+            bytes=len(resp.content) if not stream else None,
+            retries=len(retries.history) if retries is not None else 0,
+            **_phases(timings),
+        )
+        request_log.append(entry)
+        return resp
+
+def _phases(timings: Dict) -> Dict:
+    return {"dns": timings["dns"], "connect": timings["connect"], "reused": timings["connects"] == 0}
+
+@contextmanager
+def labelled(label: str):
+    """Tag the requests made on this thread inside the block (e.g. with the target being scraped)."""
+    previous = getattr(_local, "label", None)
+    _local.label = label
+    try:
+        yield
+    finally:
+        _local.label = previous
+
+def drain_request_log() -> List[Dict]:
+    entries = []
+    while request_log:
+        entries.append(request_log.popleft())
+    return entries
+
+def _build_session() -> requests.Session:
+    retry = _Retry(
+        total=SETTINGS["retries"],
+        backoff_factor=SETTINGS["backoff"],
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # hand the last response back so raise_for_status() reports it
+        max_retry_after=SETTINGS["max_retry_after"],
+    )
+    adapter = _TimedAdapter(
+        pool_connections=SETTINGS["pool_size"],
+        pool_maxsize=SETTINGS["pool_size"],
+        max_retries=retry,
+    )
+    s = requests.Session()
+    s.headers.update(DEFAULT_HEADERS)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+def configure(**overrides):
+    """Change SETTINGS (timeout, retries, backoff, max_retry_after, pool_size) and rebuild the session."""
+    global _session
+    unknown = set(overrides) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown HTTP settings: {sorted(unknown)}")
+    with _lock:
+        SETTINGS.update(overrides)
+        if _session is not None:
+            _session.close()
+        _session = None
+
+def get_session() -> requests.Session:
+    """Process-wide session: pooled keep-alive connections per host, shared by all threads."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def get(url: str, timeout: float = None, **kwargs) -> requests.Response:
+    return get_session().get(url, timeout=timeout or SETTINGS["timeout"], **kwargs)
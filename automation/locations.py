@@ -0,0 +1,134 @@
+# automation/locations.py
+import csv, re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, NamedTuple
+
+STATE_NAMES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'FL': 'Florida', 'GA': 'Georgia',
+    'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois', 'IN': 'Indiana', 'IA': 'Iowa',
+    'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland',
+    'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota', 'MS': 'Mississippi', 'MO': 'Missouri',
+    'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada', 'NH': 'New Hampshire', 'NJ': 'New Jersey',
+    'NM': 'New Mexico', 'NY': 'New York', 'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio',
+    'OK': 'Oklahoma', 'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina',
+    'SD': 'South Dakota', 'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont',
+    'VA': 'Virginia', 'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+    'DC': 'District of Columbia',
+}
+US_STATE_ABBR = frozenset(STATE_NAMES)
+
+# Offline city -> state table. Names that exist in several states (Portland, Springfield,
+# Columbus, ...) are dropped when it loads, so a bare city never resolves to a guess.
+GAZETTEER_PATH = Path(__file__).parent / "us_cities.csv"
+
+# Lowercased full name -> abbreviation (plus a few common spellings)
+_STATE_BY_NAME = {name.lower(): abbr for abbr, name in STATE_NAMES.items()}
+_STATE_BY_NAME.update({'washington dc': 'DC', 'washington d.c': 'DC', 'd.c': 'DC'})
+_COUNTRY = frozenset(['us', 'usa', 'u.s.', 'u.s.a.', 'united states', 'united states of america'])
+
+_REMOTE = re.compile(r"\b(?:remote|work from home|wfh|telecommute|anywhere|virtual)\b", re.I)
+_DOTTED_DC = re.compile(r"\bD\.\s?C\b\.?")
+_PARTS = re.compile(r"\s*(?:[,;|/()\[\]•–—]|\s-\s)\s*")
+# Workday style "US-MI-Detroit"
+_COUNTRY_STATE_CITY = re.compile(r"^(?:US|USA)-([A-Z]{2})-(.+)$")
+# "Detroit MI": a city with a trailing, unseparated abbreviation
+_TRAILING_ABBR = re.compile(r"^(.*?)[\s.]+([A-Z]{2})\.?$")
+# Words (and ZIP codes) around a place that aren't part of it; lowercase "or"/"in" only,
+# so "OR"/"IN" stay states
+_FILLER_WORDS = re.compile(
+    r"^(?:(?:(?i:hybrid|on-?site|based|only)|or|and|in|&)\s+)+"
+    r"|(?:\s+(?:(?i:hybrid|on-?site|based|only|preferred)|or|and|&|\d{5}(?:-\d{4})?))+$")
+_NOT_A_PLACE = frozenset(['hybrid', 'onsite', 'on-site', 'multiple locations', 'various locations',
+                          'nationwide', 'flexible', 'tbd', 'or', 'and', 'in', '&'])
+
+class Location(NamedTuple):
+    city: str
+    state: str   # two-letter abbreviation, or ''
+    remote: bool
+
+
+def _load_gazetteer(path: Path = GAZETTEER_PATH):
+    states = {}
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                states.setdefault(row['city'].strip().lower(), set()).add(row['state'].strip())
+    except OSError:
+        return {}
+    return {city: st.pop() for city, st in states.items() if len(st) == 1}
+
+CITY_STATE = _load_gazetteer()
+
+
+def _state_of(part: str) -> str:
+    if part in US_STATE_ABBR:  # abbreviations only count in capitals ("IN", not "in")
+        return part
+    return _STATE_BY_NAME.get(part.lower().rstrip('.'), '')
+
+
+def _split_city(part: str):
+    """(city, state) for a part that may end in a state: "Ann Arbor MI", "Ann Arbor Michigan"."""
+    m = _TRAILING_ABBR.match(part)
+    if m and m.group(2) in US_STATE_ABBR:
+        return m.group(1), m.group(2)
+    words = part.split()
+    for n in (3, 2, 1):
+        if len(words) > n:
+            st = _STATE_BY_NAME.get(' '.join(words[-n:]).lower())
+            if st:
+                return ' '.join(words[:-n]), st
+    return part, ''
+
+
+@lru_cache(maxsize=65536)
+def normalize_location(text: str) -> Location:
+    """
+    Split a free-form location ("Detroit, Michigan", "Remote - US", "Ann Arbor MI",
+    "Troy, MI (Hybrid)", "US-MI-Detroit", "Kalamazoo") into city, state abbreviation
+    and a remote flag. An explicit state (abbreviation or name, the last one wins)
+    beats the gazetteer, which is only consulted for a bare city.
+    """
+    if not text:
+        return Location('', '', False)
+    remote = bool(_REMOTE.search(text))
+    text = _DOTTED_DC.sub('DC', _REMOTE.sub(' ', text)).strip()
+    m = _COUNTRY_STATE_CITY.match(text)
+    if m and m.group(1) in US_STATE_ABBR:
+        return Location(m.group(2).strip(), m.group(1), remote)
+
+    parts, states = [], []
+    for part in _PARTS.split(text):
+        part = _FILLER_WORDS.sub('', part.strip(' .-'))
+        st = _state_of(part)
+        if st or (part and part.lower() not in _NOT_A_PLACE and part.lower() not in _COUNTRY):
+            parts.append(part)
+            states.append(st)
+
+    found = [i for i, st in enumerate(states) if st]
+    state = states[found[-1]] if found else ''
+    others = [p for i, p in enumerate(parts) if not found or i != found[-1]]
+    city = ''
+    if others:
+        city, st = _split_city(others[0])
+        state = state or st
+    elif parts:
+        # Only a state: "Michigan", but also "New York" or "Washington DC"
+        m = _TRAILING_ABBR.match(parts[0])
+        if m and m.group(2) in US_STATE_ABBR:
+            city, state = m.group(1), m.group(2)
+        elif CITY_STATE.get(parts[0].lower()) == state:
+            city = parts[0]
+    if city and not state:
+        state = CITY_STATE.get(city.lower(), '')
+    return Location(city, state, remote)
+
+
+def normalize_locations(texts: Iterable[str]) -> List[Location]:
+    """Bulk form; repeated strings (the common case) are answered from the cache."""
+    return list(map(normalize_location, texts))
+
+
+def guess_state(loc_text: str) -> str:
+    return normalize_location(loc_text or '').state
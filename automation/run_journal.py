@@ -0,0 +1,111 @@
+# automation/run_journal.py
+import hashlib, json, os, threading, time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import atomic_file
+
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR", Path(__file__).parent / ".state"))
+TARGET_RETENTION_DAYS = 30
+
+def target_key(entry: Dict) -> str:
+    """Stable identity of a config entry: what is scraped and how, not its display label."""
+    parts = [entry.get("type",""), entry.get("url",""), entry.get("title_selector",""),
+             entry.get("location_selector",""), entry.get("pairing","")]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+class RunJournal:
+    """
+    Per-target checkpoints for the daily run.
+
+    Every target that scrapes successfully is written straight away to
+    `targets/<key>.json` ({scraped_at, company, rows}). `current_run.json`
+    exists only while a run is in progress; if the process dies, the next
+    run finds it, keeps the original start time, and skips every target
+    already checkpointed since then. The same checkpoints drive the
+    max-age mode: targets scraped within the last N hours are reused as-is.
+    """
+
+    def __init__(self, directory: Path = STATE_DIR):
+        self.directory = Path(directory)
+        self.targets_dir = self.directory / "targets"
+        self.marker = self.directory / "current_run.json"
+        self.started_at: Optional[float] = None
+        self.resumed = False
+        self._lock = threading.Lock()
+
+    def begin(self, fresh: bool = False) -> bool:
+        """Start a run, or pick up an unfinished one. Returns True when resuming."""
+        self.targets_dir.mkdir(parents=True, exist_ok=True)
+        if self.marker.exists() and not fresh:
+            try:
+                self.started_at = json.loads(self.marker.read_text(encoding="utf-8"))["started_at"]
+                self.resumed = True
+                return True
+            except (OSError, ValueError, KeyError):
+                pass
+        self.started_at = time.time()
+        self.resumed = False
+        atomic_file.write_json(self.marker, {"started_at": self.started_at})
+        return False
+
+    def _path(self, entry: Dict) -> Path:
+        return self.targets_dir / f"{target_key(entry)}.json"
+
+    def load(self, entry: Dict) -> Optional[Dict]:
+        try:
+            return json.loads(self._path(entry).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def rows(self, entry: Dict, cp: Optional[Dict] = None) -> Optional[List[Dict]]:
+        """Rows of the target's last checkpoint (or of `cp`, already loaded), however old; None if there is none."""
+        cp = cp or self.load(entry)
+        if cp is None:
+            return None
+        rows = cp["rows"]
+        for r in rows:
+            r["company"] = entry.get("company","")
+        return rows
+
+    def split(self, config: List[Dict], max_age_hours: Optional[float] = None) -> Tuple[Dict[int, List[Dict]], List[int]]:
+        """
+        Partition config indices into ({index: checkpointed rows}, [indices to scrape]).
+        A checkpoint is reused if it was taken during this (resumed) run, or
+        within `max_age_hours` when that is given.
+        """
+        fresh_since = self.started_at if self.resumed else None
+        if max_age_hours is not None:
+            cutoff = time.time() - max_age_hours * 3600
+            fresh_since = cutoff if fresh_since is None else min(fresh_since, cutoff)
+        reused, todo = {}, []
+        for i, entry in enumerate(config):
+            cp = self.load(entry) if fresh_since is not None else None
+            if cp and cp["scraped_at"] >= fresh_since:
+                reused[i] = self.rows(entry, cp)
+            else:
+                todo.append(i)
+        return reused, todo
+
+    def record(self, entry: Dict, rows: List[Dict], error: Optional[Exception] = None):
+        """Checkpoint one finished target (failures are not checkpointed, so they're retried)."""
+        if error is not None:
+            return
+        with self._lock:
+            atomic_file.write_json(self._path(entry), {
+                "scraped_at": time.time(),
+                "company": entry.get("company",""),
+                "url": entry.get("url",""),
+                "rows": rows,
+            })
+
+    def finish(self):
+        """Mark the run complete and drop checkpoints of targets not seen for a month."""
+        self.marker.unlink(missing_ok=True)
+        cutoff = time.time() - TARGET_RETENTION_DAYS * 86400
+        for p in self.targets_dir.glob("*.json"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+            except OSError:
+                continue
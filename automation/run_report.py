@@ -0,0 +1,118 @@
+# automation/run_report.py
+import json, time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import atomic_file, http_client
+from .run_journal import STATE_DIR
+
+REPORTS_DIR = STATE_DIR / "reports"
+REPORT_RETENTION = 30  # newest reports kept
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round((len(values) - 1) * pct / 100)))]
+
+def _request_summary(requests: List[Dict]) -> Dict:
+    ok = [r for r in requests if r["error"] is None]
+    out = {
+        "requests": len(requests),
+        "errors": sum(1 for r in requests if r["error"] is not None or (r["status"] or 0) >= 400),
+        "retries": sum(r.get("retries") or 0 for r in requests),
+        "reused_connections": sum(1 for r in requests if r["reused"]),
+        "bytes": sum(r.get("bytes") or 0 for r in ok),
+    }
+    for phase in ("dns", "connect", "ttfb", "download", "total"):
+        values = [r[phase] for r in ok if r.get(phase) is not None]
+        out[phase] = {"sum_s": round(sum(values), 4),
+                      "p50_ms": round(_percentile(values, 50) * 1000, 2) if values else None,
+                      "p95_ms": round(_percentile(values, 95) * 1000, 2) if values else None}
+    return out
+
+class RunReport:
+    """
+    Structured timings for one daily run, written as JSON next to the journal.
+
+    - stages: wall time of each `with report.stage(name)` block, plus a summary
+      of the HTTP requests made inside it (from http_client.request_log)
+    - targets: per scraped target, fetch/parse seconds, rows, error and the
+      requests made on its behalf (labelled with the target url)
+    - counts: anything else worth tracking run to run (rows, duplicates, ...)
+    """
+
+    def __init__(self, directory: Path = REPORTS_DIR):
+        self.directory = Path(directory)
+        self.started_at = time.time()
+        self.stages: Dict[str, Dict] = {}
+        self.targets: List[Dict] = []
+        self.counts: Dict[str, int] = {}
+        self._requests: List[Dict] = []
+        http_client.drain_request_log()  # start clean
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            requests = http_client.drain_request_log()
+            for r in requests:
+                r["stage"] = name
+            self._requests.extend(requests)
+            stage = self.stages.setdefault(name, {"seconds": 0.0})
+            stage["seconds"] = round(stage["seconds"] + time.perf_counter() - started, 4)
+            stage.update(_request_summary([r for r in self._requests if r["stage"] == name]))
+
+    def target(self, entry: Dict, rows: int, error: Optional[Exception], fetch_seconds: float = None,
+               parse_seconds: float = None):
+        self.targets.append({
+            "company": entry.get("company", ""),
+            "type": entry.get("type", ""),
+            "url": entry.get("url", ""),
+            "rows": rows,
+            "error": f"{type(error).__name__}: {error}" if error is not None else None,
+            "fetch_seconds": round(fetch_seconds, 4) if fetch_seconds is not None else None,
+            "parse_seconds": round(parse_seconds, 4) if parse_seconds is not None else None,
+        })
+
+    def count(self, name: str, value: int):
+        self.counts[name] = value
+
+    def as_dict(self) -> Dict:
+        by_label: Dict[str, List[Dict]] = {}
+        for r in self._requests:
+            if r["label"]:
+                by_label.setdefault(r["label"], []).append(r)
+        targets = []
+        for t in self.targets:
+            requests = by_label.get(t["url"], [])
+            targets.append({**t, "http": _request_summary(requests) if requests else None})
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started_at)),
+            "seconds": round(time.time() - self.started_at, 3),
+            "stages": self.stages,
+            "counts": self.counts,
+            "targets": targets,
+        }
+
+    def write(self) -> Path:
+        """Write run-<timestamp>.json (and latest.json), prune old reports, print the stage summary."""
+        data = json.dumps(self.as_dict(), indent=2)
+        path = self.directory / time.strftime("run-%Y%m%d-%H%M%S.json", time.localtime(self.started_at))
+        atomic_file.write_text(path, data)
+        atomic_file.write_text(self.directory / "latest.json", data)
+        for old in sorted(self.directory.glob("run-*.json"))[:-REPORT_RETENTION]:
+            old.unlink(missing_ok=True)
+        for name, s in self.stages.items():
+            print(f"[REPORT] {name}: {s['seconds']:.1f}s, {s['requests']} requests, "
+                  f"{s['retries']} retries, {s['errors']} errors")
+        slow = sorted((t for t in self.targets if t["fetch_seconds"] is not None),
+                      key=lambda t: t["fetch_seconds"] + (t["parse_seconds"] or 0), reverse=True)[:3]
+        for t in slow:
+            print(f"[REPORT] slow target: {t['company']} {t['url']} fetch {t['fetch_seconds']:.2f}s "
+                  f"parse {t['parse_seconds'] or 0:.2f}s, {t['rows']} rows")
+        print(f"[REPORT] Wrote {path}")
+        return path
@@ -0,0 +1,177 @@
+# automation/scheduler.py
+import json, math, os, threading, time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import atomic_file
+from .delta import job_fingerprint
+from .run_journal import STATE_DIR, TARGET_RETENTION_DAYS, target_key
+
+SCHEDULE_PATH = STATE_DIR / "schedule.json"
+# Requests per day the scheduler may spend; unset = what visiting each target about once per
+# expected new posting would cost, spread more usefully
+REQUEST_BUDGET = os.getenv("SCRAPE_REQUEST_BUDGET")
+MIN_INTERVAL_HOURS = 6
+# Must stay below TARGET_RETENTION_DAYS, or a deferred target's checkpoint could be pruned
+MAX_INTERVAL_HOURS = 14 * 24
+HALF_LIFE_HOURS = 30 * 24   # older observations count half as much after this
+PRIOR_NEW, PRIOR_HOURS = 1.0, 48.0  # an unobserved target is assumed to post one job every two days
+DUE_SLACK_HOURS = 2.0       # runs drift by minutes; don't skip a target over that
+EWMA = 0.3                  # weight of the newest response time / request count
+
+class Scheduler:
+    """
+    Decides which targets are worth re-scraping this run.
+
+    For every target (keyed like the journal) it keeps the fingerprints of
+    the jobs seen last time, and decayed totals of new postings and of the
+    hours between checks: their ratio is the target's rate of new postings.
+    It also keeps a moving average of the requests and seconds one scrape
+    costs (from the run report).
+
+    Revisit intervals minimise the expected delay before a new posting is
+    picked up, within `budget` requests a day. That gives interval
+    proportional to sqrt(cost / rate): a busy board is checked every run and a
+    static venue page every week or two. Intervals are clamped between the
+    observed run cadence and MAX_INTERVAL_HOURS. Failing targets back off
+    exponentially. State lives in schedule.json between runs.
+    """
+
+    def __init__(self, path: Path = SCHEDULE_PATH, budget: Optional[float] = REQUEST_BUDGET):
+        self.path = Path(path)
+        self.budget = float(budget) if budget else None
+        self._lock = threading.Lock()
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            state = {}
+        self.targets: Dict[str, Dict] = state.get("targets", {})
+        self.runs: List[float] = state.get("runs", [])
+
+    def run_gap_hours(self) -> float:
+        """Median hours between recent runs (24 until there is a history)."""
+        gaps = sorted(b - a for a, b in zip(self.runs, self.runs[1:]))
+        return max(MIN_INTERVAL_HOURS, gaps[len(gaps) // 2] / 3600) if gaps else 24.0
+
+    def _rate(self, t: Dict) -> float:
+        return (t.get("new", 0.0) + PRIOR_NEW) / (t.get("hours", 0.0) + PRIOR_HOURS)
+
+    def intervals(self, keys: List[str]) -> Dict[str, float]:
+        """Revisit interval in hours for each key, spending at most the daily budget."""
+        low, high = self.run_gap_hours(), MAX_INTERVAL_HOURS
+        cost = {k: max(1.0, self.targets.get(k, {}).get("requests", 1.0)) for k in keys}
+        rate = {k: self._rate(self.targets.get(k, {})) for k in keys}
+        budget = self.budget
+        if budget is None:
+            budget = sum(cost[k] * 24 / min(max(1 / rate[k], low), high) for k in keys)
+        weight = {k: math.sqrt(cost[k] * rate[k]) for k in keys}
+        out, free = {}, set(keys)
+        # Solve for the scale with the free targets, pin whatever lands outside [low, high], repeat
+        while free:
+            spare = budget - sum(cost[k] * 24 / out[k] for k in out)
+            scale = 24 * sum(weight[k] for k in free) / spare if spare > 0 else math.inf
+            pinned = False
+            for k in list(free):
+                interval = scale * math.sqrt(cost[k] / rate[k])
+                if interval <= low or interval >= high:
+                    out[k] = min(max(interval, low), high)
+                    free.discard(k)
+                    pinned = True
+            if not pinned:
+                for k in free:
+                    out[k] = scale * math.sqrt(cost[k] / rate[k])
+                break
+        return out
+
+    def plan(self, config: List[Dict], indices: List[int], now: Optional[float] = None) -> Tuple[List[int], List[int]]:
+        """
+        Split `indices` of `config` into (scrape now, not due yet). Targets never
+        scraped are always due; overdue ones go first and stop once this run's
+        share of the budget is spent.
+        """
+        now = time.time() if now is None else now
+        keys = {i: target_key(config[i]) for i in indices}
+        interval = self.intervals(list(keys.values()))
+        gap = self.run_gap_hours()
+        new, overdue, later = [], [], []
+        for i in indices:
+            key = keys[i]
+            t = self.targets.get(key)
+            if t is None or not ("checked_at" in t or t.get("failures")):
+                new.append(i)
+                continue
+            t["interval_hours"] = round(interval[key], 2)
+            if t.get("failures"):
+                due_at = t["failed_at"] + min(interval[key], gap * 2 ** (t["failures"] - 1)) * 3600
+            else:
+                due_at = t["checked_at"] + interval[key] * 3600
+            lateness = (now + DUE_SLACK_HOURS * 3600 - due_at) / (interval[key] * 3600)
+            (overdue if lateness >= 0 else later).append((lateness, i))
+
+        due = list(new)
+        if self.budget is not None:
+            spend = sum(self.targets.get(keys[i], {}).get("requests", 1.0) for i in new)
+            allowance = self.budget * gap / 24
+            for lateness, i in sorted(overdue, reverse=True):
+                cost = self.targets[keys[i]].get("requests", 1.0)
+                if spend + cost > allowance and due:
+                    later.append((lateness, i))
+                    continue
+                spend += cost
+                due.append(i)
+        else:
+            due.extend(i for _, i in overdue)
+        print(f"[SCHEDULE] {len(due)} of {len(indices)} targets due ({len(new)} new), "
+              f"{len(later)} deferred; runs every ~{gap:.0f}h")
+        return sorted(due), sorted(i for _, i in later)
+
+    def backing_off(self, entry: Dict) -> bool:
+        """True while a target's last scrape failed; plan() holds it back until its backoff expires."""
+        return bool(self.targets.get(target_key(entry), {}).get("failures"))
+
+    def record(self, entry: Dict, rows: List[Dict], error: Optional[Exception] = None, now: Optional[float] = None):
+        """Note one scrape's outcome: which postings are new since the last check, or a failure."""
+        now = time.time() if now is None else now
+        with self._lock:
+            t = self.targets.setdefault(target_key(entry), {})
+            t["company"] = entry.get("company", "")
+            t["url"] = entry.get("url", "")
+            if error is not None:
+                t["failures"] = t.get("failures", 0) + 1
+                t["failed_at"] = now
+                return
+            t.pop("failures", None)
+            t.pop("failed_at", None)
+            seen = {job_fingerprint(r) for r in rows}
+            if "checked_at" in t:
+                hours = max(0.0, (now - t["checked_at"]) / 3600)
+                decay = 0.5 ** (hours / HALF_LIFE_HOURS)
+                added = len(seen - set(t.get("jobs", [])))
+                t["new"] = t.get("new", 0.0) * decay + added
+                t["hours"] = t.get("hours", 0.0) * decay + hours
+                if added or len(seen) != len(t.get("jobs", [])):
+                    t["changed_at"] = now
+            t["checked_at"] = now
+            t["jobs"] = sorted(seen)
+
+    def record_costs(self, config: List[Dict], report):
+        """Fold each target's request count and fetch seconds from the run report into its averages."""
+        by_url = {e.get("url", ""): target_key(e) for e in config}
+        for rt in report.as_dict()["targets"]:
+            key = by_url.get(rt["url"])
+            if key is None or key not in self.targets or rt["error"] is not None:
+                continue
+            t = self.targets[key]
+            requests = rt["http"]["requests"] if rt["http"] else 1
+            seconds = (rt["fetch_seconds"] or 0) + (rt["parse_seconds"] or 0)
+            for field, value in (("requests", requests), ("seconds", seconds)):
+                t[field] = round(value if field not in t else (1 - EWMA) * t[field] + EWMA * value, 4)
+
+    def save(self, started_at: Optional[float] = None):
+        """Persist the state, noting this run's start for the cadence estimate."""
+        if started_at is not None and (not self.runs or started_at > self.runs[-1]):
+            self.runs = (self.runs + [started_at])[-10:]
+        cutoff = (started_at or time.time()) - TARGET_RETENTION_DAYS * 86400
+        targets = {k: t for k, t in self.targets.items()
+                   if max(t.get("checked_at", 0), t.get("failed_at", 0)) >= cutoff}
+        atomic_file.write_json(self.path, {"runs": self.runs, "targets": targets})
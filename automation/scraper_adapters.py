@@ -1,20 +1,203 @@
-import requests, re, time
-from bs4 import BeautifulSoup
+import hashlib, json, os, re, sys, threading, time
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import EncodingDetector
 from urllib.parse import urljoin
 
-HEADERS = {
-    "User-Agent": "CareerScraperBot/1.0 (+contact: ops@example.com)"
-}
+from . import http_client
+from .http_cache import ResponseCache
+from .discovery import ATS_PATTERNS
+from .locations import guess_state
+
+# Public ATS job-list APIs, keyed by the board slug (overridable to point at a local stub)
+GREENHOUSE_API = os.getenv("GREENHOUSE_API", "https://boards-api.greenhouse.io/v1/boards/{slug}/jobs")
+LEVER_API = os.getenv("LEVER_API", "https://api.lever.co/v0/postings/{slug}")
+LEVER_PAGE_SIZE = 100
+
+# Bump when an adapter's extraction changes, so cached rows from the old code aren't reused
+PARSER_VERSION = 4
+
+response_cache = ResponseCache()
+
+# "strained" parses only what the adapter reads; "full" builds the whole tree (for comparison)
+PARSE_MODE = os.getenv("SCRAPER_PARSE_MODE", "strained")
+
+# Subtrees that never hold job data but make up much of a modern page's markup
+_NOISE = re.compile(rb"<(script|style|svg)\b.*?</\1\s*>|<!--.*?-->", re.I | re.S)
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$")
+
+# One entry per page actually parsed (cache hits don't count), for the end-of-run summary
+parse_timings = []
+_timings_lock = threading.Lock()
+
+def _encoding(r):
+    # Trust an explicit charset; otherwise the page's <meta>, then UTF-8.
+    # Naming one up front keeps bs4 from running charset detection over the whole body.
+    if "charset" in r.headers.get("Content-Type", "").lower():
+        return r.encoding
+    return EncodingDetector.find_declared_encoding(r.content[:4096], is_html=True) or "utf-8"
+
+def _soup(body, encoding=None, strainer=None):
+    """
+    Build a tree from raw bytes. In strained mode script/style/svg/comments
+    are cut out before tokenizing (no adapter reads them), and when a
+    `strainer` is given only the subtrees it matches are built.
+    """
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+        encoding = "utf-8"
+    if PARSE_MODE == "full":
+        return BeautifulSoup(body, "html.parser", from_encoding=encoding)
+    return BeautifulSoup(_NOISE.sub(b"", body), "html.parser", from_encoding=encoding, parse_only=strainer)
+
+def _selector_strainer(*selectors):
+    """
+    SoupStrainer covering every element the selectors can match, or None when
+    a selector needs context the strainer would drop (combinators, attributes).
+    Only single compounds like `h3`, `.job-title` or `li.job` qualify.
+    """
+    classes, tags = [], []
+    for selector in selectors:
+        for part in (selector or "").split(","):
+            part = part.strip()
+            m = _SIMPLE_SELECTOR.match(part)
+            if not part or not m:
+                return None
+            tag, cls = m.group(1), m.group(2)
+            if cls:
+                classes.append(cls.split(".")[1])
+            else:
+                tags.append(tag.lower())
+    if classes and not tags:
+        return SoupStrainer(class_=classes)
+    if tags and not classes:
+        return SoupStrainer(tags)
+    return None
+
+def fetch_page(url, parse_key):
+    """
+    Conditional GET for `url`. Returns a page dict: when the cache can answer
+    (304 or an unchanged body) page["rows"] holds the cached rows; otherwise
+    page["body"] / page["encoding"] are set and the rows still need parsing.
+    """
+    parse_key = f"v{PARSER_VERSION}|{parse_key}"
+    entry = response_cache.get(url, parse_key)
+    r = http_client.get(url, headers=response_cache.conditional_headers(entry))
+    page = {
+        "url": url,
+        "parse_key": parse_key,
+        "etag": r.headers.get("ETag", ""),
+        "last_modified": r.headers.get("Last-Modified", ""),
+        "rows": None,
+    }
+    if r.status_code == 304 and entry:
+        page["body_hash"] = entry["body_hash"]
+        # A 304 may omit the validators; keep the ones we already have
+        page["etag"] = page["etag"] or entry["etag"]
+        page["last_modified"] = page["last_modified"] or entry["last_modified"]
+        page["rows"] = entry["rows"]
+    else:
+        r.raise_for_status()
+        page["body_hash"] = hashlib.sha256(r.content).hexdigest()
+        if entry and entry["body_hash"] == page["body_hash"]:
+            page["rows"] = entry["rows"]
+        else:
+            page["body"] = r.content
+            page["encoding"] = _encoding(r)
+    if page["rows"] is not None:
+        save_page(page, page["rows"])  # refresh validators and the TTL
+    return page
+
+def save_page(page, rows, parse_seconds=None):
+    """Cache the rows extracted from `page` (and log the parse time, if one was run)."""
+    response_cache.put(page["url"], page["parse_key"], rows, page["body_hash"],
+                       etag=page["etag"], last_modified=page["last_modified"])
+    if parse_seconds is not None:
+        with _timings_lock:
+            parse_timings.append({
+                "url": page["url"],
+                "parser": page["parse_key"].split("|")[1],
+                "mode": PARSE_MODE,
+                "bytes": page.get("bytes") or len(page.get("body", b"")),
+                "seconds": parse_seconds,
+                "rows": len(rows),
+            })
 
-def _get(url, timeout=15):
-    resp = requests.get(url, headers=HEADERS, timeout=timeout)
-    resp.raise_for_status()
-    return resp
+def parse_task(task):
+    """
+    Pure CPU step, safe to run in a worker process: raw page bytes plus the
+    parser name and its arguments in, (rows, parse seconds) out.
+    """
+    started = time.perf_counter()
+    rows = PARSERS[task["parser"]](task["body"], encoding=task["encoding"], **task["args"])
+    return rows, time.perf_counter() - started
+
+def _html_page(url, parse_key, parser, args):
+    """Fetch an HTML page; returns (cached rows, None) or (None, (page, parse task))."""
+    page = fetch_page(url, parse_key)
+    if page["rows"] is not None:
+        return page["rows"], None
+    # The body travels with the task; the page keeps only what save_page needs
+    body = page.pop("body")
+    page["bytes"] = len(body)
+    task = {"parser": parser, "body": body, "encoding": page["encoding"], "args": args}
+    return None, (page, task)
+
+def _json_page(url, parser, parse):
+    # JSON decoding is cheap, so API responses are parsed right here in the fetch stage
+    page = fetch_page(url, parser)
+    if page["rows"] is not None:
+        return page["rows"]
+    started = time.perf_counter()
+    rows = parse(json.loads(page["body"]))
+    save_page(page, rows, time.perf_counter() - started)
+    return rows
+
+def complete(fetched):
+    """Finish a fetch_* result in-process: parse the pending page, if any, and return the rows."""
+    rows, pending = fetched
+    if pending is None:
+        return rows
+    page, task = pending
+    rows, seconds = parse_task(task)
+    save_page(page, rows, seconds)
+    return rows
+
+def _board_slug(board_url, typ):
+    for rx, kind in ATS_PATTERNS:
+        m = rx.match(board_url)
+        if m and kind == typ:
+            return m.group(1)
+    raise ValueError(f"no {typ} board slug in {board_url}")
+
+def fetch_greenhouse(board_url):
+    """Use the public Job Board JSON API; fall back to the board HTML if that fails."""
+    try:
+        slug = _board_slug(board_url, "greenhouse")
+        return _json_page(GREENHOUSE_API.format(slug=slug), "greenhouse-api", parse_greenhouse_json), None
+    except Exception as e:
+        print(f"[WARN] Greenhouse API failed for {board_url} ({e}); falling back to HTML", file=sys.stderr)
+    return _html_page(board_url, "greenhouse", "greenhouse", {"board_url": board_url})
 
 def scrape_greenhouse(board_url):
+    return complete(fetch_greenhouse(board_url))
+
+def parse_greenhouse_json(data):
+    # The board API returns every open job in one response: {"jobs": [...], "meta": {"total": N}}
     jobs = []
-    r = _get(board_url)
-    soup = BeautifulSoup(r.text, "html.parser")
+    for job in data.get("jobs", []):
+        loc_text = ((job.get("location") or {}).get("name") or "").strip()
+        jobs.append({
+            "title": (job.get("title") or "").strip(),
+            "location": loc_text,
+            "state": guess_state(loc_text),
+            "source_url": job.get("absolute_url") or "",
+        })
+    return jobs
+
+def parse_greenhouse(html, board_url, encoding=None):
+    jobs = []
+    # Openings are located via their parent <div>/<li>, so only the noise is stripped here
+    soup = _soup(html, encoding)
     for opening in soup.select(".opening a, a[href*='/jobs/']"):
         title = opening.get_text(strip=True)
         job_url = urljoin(board_url, opening.get("href"))
@@ -32,11 +215,48 @@ def scrape_greenhouse(board_url):
         })
     return jobs
 
+def fetch_lever(board_url):
+    """Page through the public postings JSON API; fall back to the board HTML if that fails."""
+    try:
+        slug = _board_slug(board_url, "lever")
+        jobs = []
+        skip = 0
+        while True:
+            page_url = f"{LEVER_API.format(slug=slug)}?mode=json&skip={skip}&limit={LEVER_PAGE_SIZE}"
+            page = _json_page(page_url, "lever-api", parse_lever_json)
+            jobs.extend(page)
+            if len(page) < LEVER_PAGE_SIZE:
+                return jobs, None
+            skip += LEVER_PAGE_SIZE
+    except Exception as e:
+        print(f"[WARN] Lever API failed for {board_url} ({e}); falling back to HTML", file=sys.stderr)
+    return _html_page(board_url, "lever", "lever", {"board_url": board_url})
+
 def scrape_lever(board_url):
+    return complete(fetch_lever(board_url))
+
+def parse_lever_json(postings):
+    # A bare list of postings, one page at a time
+    if not isinstance(postings, list):
+        raise ValueError("unexpected Lever response")
+    jobs = []
+    for post in postings:
+        loc_text = ((post.get("categories") or {}).get("location") or "").strip()
+        jobs.append({
+            "title": (post.get("text") or "").strip(),
+            "location": loc_text,
+            "state": guess_state(loc_text),
+            "source_url": post.get("hostedUrl") or "",
+        })
+    return jobs
+
+def parse_lever(html, board_url, encoding=None):
     jobs = []
-    r = _get(board_url)
-    soup = BeautifulSoup(r.text, "html.parser")
-    for post in soup.select("div.posting, .posting, a.posting-title"):
+    # Everything we read lives inside a .posting / .posting-title subtree
+    soup = _soup(html, encoding, SoupStrainer(class_=["posting", "posting-title"]))
+    # A posting is a div.posting wrapping an a.posting-title; only fall back to bare titles
+    # when there are no wrappers, or every posting comes out twice
+    for post in soup.select("div.posting") or soup.select(".posting, a.posting-title"):
         title_node = post.select_one(".posting-title h5, h5, .title")
         if not title_node and hasattr(post, "get"):
             title_node = post
@@ -53,19 +273,31 @@ def scrape_lever(board_url):
         })
     return jobs
 
-def scrape_generic_page(page_url, title_selector, location_selector):
+PAIRING_STRATEGIES = ("container", "order", "zip")
+
+def fetch_generic_page(page_url, title_selector, location_selector, pairing="container"):
+    return _html_page(page_url, f"generic|{title_selector}|{location_selector}|{pairing}", "generic", {
+        "page_url": page_url,
+        "title_selector": title_selector,
+        "location_selector": location_selector,
+        "pairing": pairing,
+    })
+
+def scrape_generic_page(page_url, title_selector, location_selector, pairing="container"):
+    return complete(fetch_generic_page(page_url, title_selector, location_selector, pairing))
+
+def parse_generic_page(html, page_url, title_selector, location_selector, pairing="container", encoding=None):
     jobs = []
-    r = _get(page_url)
-    soup = BeautifulSoup(r.text, "html.parser")
+    # Container pairing walks up from each title, so it needs the surrounding tree;
+    # the positional strategies only need the matched elements themselves.
+    strainer = _selector_strainer(title_selector, location_selector) if pairing != "container" else None
+    soup = _soup(html, encoding, strainer)
     titles = soup.select(title_selector) if title_selector else []
-    for t in titles:
+    locations = soup.select(location_selector) if (location_selector and titles) else []
+    paired = pair_locations(soup, titles, locations, pairing)
+    for t, loc in zip(titles, paired):
         title = t.get_text(strip=True)
-        loc_node, loc_text = None, ""
-        if location_selector:
-            all_locs = soup.select(location_selector)
-            idx = list(t.parent.children).index(t) if t.parent else -1
-            if 0 <= idx < len(all_locs):
-                loc_text = all_locs[idx].get_text(strip=True)
+        loc_text = loc.get_text(strip=True) if loc is not None else ""
         jobs.append({
             "title": title,
             "location": loc_text,
@@ -74,19 +306,82 @@ def scrape_generic_page(page_url, title_selector, location_selector):
         })
     return jobs
 
-US_STATE_ABBR = {
-    'AL','AK','AZ','AR','CA','CO','CT','DE','FL','GA','HI','ID','IL','IN','IA','KS','KY','LA','ME','MD','MA','MI',
-    'MN','MS','MO','MT','NE','NV','NH','NJ','NM','NY','NC','ND','OH','OK','OR','PA','RI','SC','SD','TN','TX','UT',
-    'VT','VA','WA','WV','WI','WY','DC'
-}
+def pair_locations(soup, titles, locations, strategy="container"):
+    """
+    Match each title node with at most one location node; returns a list
+    parallel to `titles` (None where nothing matched). Both inputs are in
+    document order, as soup.select returns them.
+
+    - container: the location inside the title's posting container, i.e. the
+      largest ancestor of the title that holds no other title; flat layouts
+      (titles and locations as siblings, so no container matches) fall back to order
+    - order: the first location after the title and before the next title
+    - zip: the i-th location for the i-th title (flat lists of equal length)
+
+    All strategies are linear in the number of nodes (times tree depth for
+    container), so pages with thousands of postings stay cheap.
+    """
+    if strategy not in PAIRING_STRATEGIES:
+        raise ValueError(f"unknown pairing strategy '{strategy}', expected one of {PAIRING_STRATEGIES}")
+    paired = [None] * len(titles)
+    if not titles or not locations:
+        return paired
+
+    if strategy == "zip":
+        for i in range(min(len(titles), len(locations))):
+            paired[i] = locations[i]
+        return paired
 
-def guess_state(loc_text):
-    if not loc_text:
-        return ""
-    m = re.search(r",\s*([A-Z]{2})(?:\b|[^A-Za-z])", loc_text)
-    if m and m.group(1) in US_STATE_ABBR:
-        return m.group(1)
-    m = re.search(r"\s-\s([A-Z]{2})\b", loc_text)
-    if m and m.group(1) in US_STATE_ABBR:
-        return m.group(1)
-    return ""
+    if strategy == "container":
+        paired = _pair_by_container(titles, locations)
+        if any(loc is not None for loc in paired):
+            return paired
+
+    # order: one walk over the tree to get document positions, then a two-pointer merge
+    wanted = {id(n) for n in titles} | {id(n) for n in locations}
+    pos = {}
+    for i, node in enumerate(soup.descendants):
+        if id(node) in wanted:
+            pos[id(node)] = i
+    j = 0
+    for i, t in enumerate(titles):
+        start = pos[id(t)]
+        end = pos[id(titles[i + 1])] if i + 1 < len(titles) else float("inf")
+        while j < len(locations) and pos[id(locations[j])] <= start:
+            j += 1
+        if j < len(locations) and pos[id(locations[j])] < end:
+            paired[i] = locations[j]
+            j += 1
+    return paired
+
+def _pair_by_container(titles, locations):
+    # Count titles under each ancestor, then grow each title up to its container
+    paired = [None] * len(titles)
+    counts = {}
+    for t in titles:
+        node = t.parent
+        while node is not None:
+            counts[id(node)] = counts.get(id(node), 0) + 1
+            node = node.parent
+    container_of = {}
+    for i, t in enumerate(titles):
+        c = t
+        while c.parent is not None and counts.get(id(c.parent)) == 1:
+            c = c.parent
+        container_of[id(c)] = i
+    for loc in locations:
+        node = loc
+        while node is not None and id(node) not in container_of:
+            node = node.parent
+        if node is not None:
+            i = container_of[id(node)]
+            if paired[i] is None:
+                paired[i] = loc
+    return paired
+
+# Parsers reachable from parse_task, by name (so tasks stay picklable)
+PARSERS = {
+    "greenhouse": parse_greenhouse,
+    "lever": parse_lever,
+    "generic": parse_generic_page,
+}
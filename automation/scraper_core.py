@@ -1,35 +1,200 @@
-import csv, time, sys
+import csv, gzip, itertools, multiprocessing, os, queue, shutil, sys, threading, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict
-import requests
-
-from .scraper_adapters import scrape_greenhouse, scrape_lever, scrape_generic_page
-
-def scrape_from_config(config: List[Dict]) -> List[Dict]:
-    all_rows = []
-    for entry in config:
-        company = entry.get("company","")
-        typ = entry.get("type","").lower()
-        url = entry.get("url","")
-        try:
-            if typ == "greenhouse":
-                rows = scrape_greenhouse(url)
-            elif typ == "lever":
-                rows = scrape_lever(url)
-            elif typ == "generic":
-                rows = scrape_generic_page(url, entry.get("title_selector",""), entry.get("location_selector",""))
+from typing import Callable, List, Dict, Optional
+
+from .scraper_adapters import (
+    fetch_greenhouse, fetch_lever, fetch_generic_page, complete, parse_task, save_page,
+    response_cache, parse_timings,
+)
+from . import http_client
+from .throttle import HostThrottle, host_of
+from .dedup import Deduplicator
+from .run_report import RunReport
+
+# Parse workers start on the first submit(), when fetch threads are already running (maybe
+# holding urllib3's or the import lock); forking then can hand a child a lock nobody releases.
+# forkserver/spawn start them from a clean, single-threaded process instead.
+PARSE_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+def _fetch_target(entry: Dict):
+    """Fetch stage for one config entry: returns (rows, pending parse or None)."""
+    company = entry.get("company","")
+    typ = entry.get("type","").lower()
+    url = entry.get("url","")
+    if typ == "greenhouse":
+        return fetch_greenhouse(url)
+    if typ == "lever":
+        return fetch_lever(url)
+    if typ == "generic":
+        return fetch_generic_page(url, entry.get("title_selector",""), entry.get("location_selector",""),
+                                  pairing=entry.get("pairing","container"))
+    print(f"[WARN] Unsupported type '{typ}' for company {company}. Skipping.", file=sys.stderr)
+    return [], None
+
+def _target_error(entry: Dict, e: Exception):
+    print(f"[ERROR] Failed scraping {entry.get('company','')} ({entry.get('type','')}) {entry.get('url','')}: {e}", file=sys.stderr)
+
+def scrape_from_config(config: List[Dict], max_workers: int = 8, per_host_delay: float = 1.2,
+                       parse_workers: Optional[int] = None, queue_size: int = 32,
+                       on_result: Optional[Callable[[Dict, List[Dict], Optional[Exception]], None]] = None,
+                       dedupe: bool = True, report: Optional[RunReport] = None) -> List[Dict]:
+    """
+    Scrape every entry in two stages joined by a bounded queue:
+
+    - fetch: up to `max_workers` hosts in flight on threads. Targets on the
+      same host run one after another, spaced `per_host_delay` seconds apart.
+    - parse: HTML pages go to a pool of `parse_workers` processes (default one
+      per core) as raw bytes + parser name + selectors, so parsing isn't held
+      to one core by the GIL. 0 parses in this process instead.
+
+    At most `queue_size` fetched pages wait for the parse stage, plus two per
+    parse worker in flight; beyond that the fetchers block, which caps memory.
+    Rows come back in config order and a failing target only loses its own rows.
+    `on_result(entry, rows, error)` is called from this thread as each target
+    finishes, e.g. to checkpoint it. The combined rows go through one
+    dedup pass (see dedup.Deduplicator) unless `dedupe` is False. With a
+    `report`, each target's fetch/parse time, rows and error are added to it
+    and its requests are labelled with the target url.
+    """
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+    throttle = HostThrottle(per_host_delay)
+    parse_timings.clear()
+    results: List[List[Dict]] = [[] for _ in config]
+    fetch_seconds: List[Optional[float]] = [None] * len(config)
+    parse_seconds: List[Optional[float]] = [None] * len(config)
+    fetched: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+
+    # One lane per host, so a big ATS host ties up a single worker instead of all of them.
+    # A malformed url goes in the "" lane and fails in _fetch_target, for that target only.
+    lanes: Dict[str, List[int]] = {}
+    for i, entry in enumerate(config):
+        lanes.setdefault(host_of(entry.get("url","")), []).append(i)
+
+    # Set when the consumer side fails: fetchers stop picking up targets and stop waiting on the queue
+    stop = threading.Event()
+
+    def run_lane(indices):
+        for i in indices:
+            if stop.is_set():
+                return
+            entry = config[i]
+            throttle.wait(entry.get("url",""))
+            started = time.perf_counter()
+            try:
+                with http_client.labelled(entry.get("url","")):
+                    rows, pending = _fetch_target(entry)
+            except Exception as e:
+                rows, pending, error = [], None, e
             else:
-                print(f"[WARN] Unsupported type '{typ}' for company {company}. Skipping.", file=sys.stderr)
-                rows = []
-            for r in rows:
-                r["company"] = company
-            all_rows.extend(rows)
-            time.sleep(1.2)
-        except Exception as e:
-            print(f"[ERROR] Failed scraping {company} ({typ}) {url}: {e}", file=sys.stderr)
-            continue
+                error = None
+            fetch_seconds[i] = time.perf_counter() - started  # before the consumer can see it
+            while not stop.is_set():
+                try:
+                    fetched.put((i, rows, pending, error), timeout=0.2)
+                    break
+                except queue.Full:
+                    continue
+
+    in_flight: Dict = {}
+
+    def finish(i: int, rows: List[Dict], error: Optional[Exception] = None):
+        if error is not None:
+            _target_error(config[i], error)
+            rows = []
+        for r in rows:
+            r["company"] = config[i].get("company","")
+        results[i] = rows
+        if report is not None:
+            report.target(config[i], len(rows), error, fetch_seconds[i], parse_seconds[i])
+        if on_result is not None:
+            on_result(config[i], rows, error)
+
+    def collect(block: bool):
+        done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED) if block else (
+            [f for f in in_flight if f.done()], None)
+        for fut in done:
+            i, page = in_flight.pop(fut)
+            try:
+                rows, seconds = fut.result()
+                parse_seconds[i] = seconds
+                save_page(page, rows, seconds)
+            except Exception as e:
+                finish(i, [], e)
+            else:
+                finish(i, rows)
+
+    parse_pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=PARSE_CONTEXT) if parse_workers > 0 else None
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        # Longest lanes first so they don't end up as the tail of the run
+        for lane in sorted(lanes.values(), key=len, reverse=True):
+            fetch_pool.submit(run_lane, lane)
+
+        for _ in range(len(config)):
+            i, rows, pending, error = fetched.get()
+            if error is not None or pending is None:
+                finish(i, rows or [], error)
+            elif parse_pool is None:
+                started = time.perf_counter()
+                try:
+                    rows = complete((rows, pending))
+                    parse_seconds[i] = time.perf_counter() - started
+                except Exception as e:
+                    finish(i, [], e)
+                else:
+                    finish(i, rows)
+            else:
+                while len(in_flight) >= 2 * parse_workers:
+                    collect(block=True)
+                page, task = pending
+                in_flight[parse_pool.submit(parse_task, task)] = (i, page)
+            if in_flight:
+                collect(block=False)
+        while in_flight:
+            collect(block=True)
+    except BaseException:
+        # e.g. on_result failing to write a checkpoint, or Ctrl-C: without this the fetchers
+        # sit in put() on the full queue forever and the pool's shutdown never returns
+        stop.set()
+        while True:
+            try:
+                fetched.get_nowait()
+            except queue.Empty:
+                break
+        fetch_pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    else:
+        fetch_pool.shutdown(wait=True)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+
+    response_cache.evict()
+    _report_parse_timings()
+
+    all_rows = itertools.chain.from_iterable(results)
+    if not dedupe:
+        return list(all_rows)
+    deduper = Deduplicator()
+    all_rows = list(deduper.filter(all_rows))
+    deduper.report()
     return all_rows
 
+def _report_parse_timings():
+    if not parse_timings:
+        print("[PARSE] No pages parsed (all targets served from cache)")
+        return
+    by_parser: Dict[str, List[Dict]] = {}
+    for t in parse_timings:
+        by_parser.setdefault(f"{t['parser']}/{t['mode']}", []).append(t)
+    for key, items in sorted(by_parser.items()):
+        secs = sum(t["seconds"] for t in items)
+        mb = sum(t["bytes"] for t in items) / 1e6
+        print(f"[PARSE] {key}: {len(items)} pages, {mb:.1f} MB, {secs:.2f}s total, {1000 * secs / len(items):.1f} ms/page")
+
 def write_csv(rows: List[Dict], out_path: Path):
     out_path.parent.mkdir(parents=True, exist_ok=True)
     with out_path.open("w", newline="", encoding="utf-8") as f:
@@ -45,7 +210,11 @@ def write_csv(rows: List[Dict], out_path: Path):
             })
 
 def upload_csv(csv_path: Path, upload_url: str):
-    with csv_path.open("rb") as fh:
-        resp = requests.post(upload_url, files={"file": fh})
+    # Ship it gzip-compressed; the backend decompresses while it streams the upload
+    gz_path = csv_path.with_name(csv_path.name + ".gz")
+    with csv_path.open("rb") as src, gzip.open(gz_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    with gz_path.open("rb") as fh:
+        resp = http_client.get_session().post(upload_url, files={"file": (gz_path.name, fh, "application/gzip")})
         resp.raise_for_status()
     return resp.text
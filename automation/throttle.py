@@ -0,0 +1,58 @@
+# automation/throttle.py
+import threading, time
+from urllib.parse import urlsplit
+
+def host_of(url: str) -> str:
+    """Lower-case host of `url`; "" when there is none or the URL is malformed (e.g. "http://[broken")."""
+    try:
+        return (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+class HostThrottle:
+    """
+    Per-host politeness: requests to the same host are spaced at least
+    `min_interval` seconds apart, requests to different hosts don't wait
+    on each other. Safe to share between threads.
+    """
+
+    def __init__(self, min_interval: float = 1.2):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        host = host_of(url)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        # Sleep outside the lock so other hosts can book their slots meanwhile
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+class TokenBucket:
+    """
+    Global rate limit: `rate` acquisitions per second on average, with bursts
+    of up to `capacity`. Safe to share between threads.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
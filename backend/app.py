@@ -1,158 +1,244 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import csv, os
+import csv, io, json, os, time, zlib
+
+import metrics
+from job_store import FIELDS, KEEP_HEAD_BYTES, DeltaConflict, JobStore
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Total-Count', 'X-Next-Cursor'])
 
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-CSV_PATH = os.path.join(UPLOAD_FOLDER, 'scraped_jobs.csv')
+DB_PATH = os.getenv('JOBS_DB_PATH', os.path.join(UPLOAD_FOLDER, 'jobs.db'))
+# 0 turns off memory-mapped reads (e.g. on a network filesystem)
+store = JobStore(DB_PATH, mmap_bytes=int(os.getenv('JOBS_DB_MMAP_MB', '1024')) << 20)
+NDJSON = 'application/x-ndjson'
+
+# One-time import of the CSV the backend used to keep before the SQLite store;
+# every gunicorn worker gets here, only the first one imports
+LEGACY_CSV_PATH = os.path.join(UPLOAD_FOLDER, 'scraped_jobs.csv')
+if store.latest() is None and os.path.exists(LEGACY_CSV_PATH):
+    with open(LEGACY_CSV_PATH, 'rb') as f:
+        store.ingest(f, if_empty=True)
+
+REQUEST_SECONDS = metrics.Histogram(
+    'http_request_duration_seconds', 'Time to response headers (streamed bodies keep going after).',
+    ('route', 'method', 'status'))
+NOT_MODIFIED = metrics.Counter('http_not_modified_total', '304s served from the ETag check.', ('route',))
+INGEST_SECONDS = metrics.Histogram('ingest_duration_seconds', 'Time to apply an upload.', ('kind',))
+INGEST_ROWS = metrics.Counter('ingest_rows_total', 'Rows in applied uploads (full) or upserted (delta).', ('kind',))
+INGEST_FAILURES = metrics.Counter('ingest_failures_total', 'Uploads rejected (bad CSV, delta conflict).', ('kind',))
+JOBS_ROWS = metrics.Gauge('jobs_rows', 'Rows in the current job table.',
+                          fn=lambda: (store.latest() or {}).get('rows', 0))
+FACET_CACHE_HITS = metrics.Counter('facet_cache_hits_total', 'Facet lookups answered from the cache.',
+                                   fn=lambda: store.facet_cache_hits)
+FACET_CACHE_MISSES = metrics.Counter('facet_cache_misses_total', 'Facet lookups that queried the database.',
+                                     fn=lambda: store.facet_cache_misses)
+
+@app.before_request
+def _start_timer():
+    g.started = time.perf_counter()
+
+@app.after_request
+def _record_request(resp):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    if 'started' in g:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.started, route, request.method, resp.status_code)
+    if resp.status_code == 304:
+        NOT_MODIFIED.inc(route)
+    return resp
 
 @app.route('/upload', methods=['POST'])
 def upload():
+    """
+    Accepts either a multipart `file` field (.csv or .csv.gz) or a raw
+    text/csv body; `Content-Encoding: gzip` marks a compressed raw body.
+    """
     file = request.files.get('file')
-    if not file or not file.filename.endswith('.csv'):
+    if file:
+        if not file.filename.endswith(('.csv', '.csv.gz')):
+            return jsonify({"error": "Invalid file"}), 400
+        stream, gzipped = file.stream, file.filename.endswith('.gz')
+    elif request.mimetype in ('text/csv', 'application/gzip'):
+        # Raw body: read straight off the socket instead of spooling a form first
+        stream = request.stream
+        gzipped = request.mimetype == 'application/gzip' or request.content_encoding == 'gzip'
+    else:
         return jsonify({"error": "Invalid file"}), 400
-    file.save(CSV_PATH)
-    return jsonify({"message": "File uploaded"}), 200
+
+    started = time.perf_counter()
+    try:
+        upload = store.ingest(stream, gzipped=gzipped)
+    except (UnicodeDecodeError, OSError, csv.Error) as e:
+        INGEST_FAILURES.inc('full')
+        return jsonify({"error": f"Could not read CSV: {e}"}), 400
+    INGEST_SECONDS.observe(time.perf_counter() - started, 'full')
+    INGEST_ROWS.inc('full', amount=upload['rows'])
+    return jsonify({"message": "File uploaded", "rows": upload['rows'], "digest": upload['digest']}), 200
+
+@app.route('/upload/delta', methods=['POST'])
+def upload_delta():
+    """
+    Apply only the changed jobs:
+      {"base": <digest the runner last uploaded>, "upserts": [row, ...],
+       "deletes": [fingerprint, ...], "result": <digest expected afterwards>}
+    409 means the snapshots disagree and the runner should send the full CSV.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get('base'), str):
+        return jsonify({"error": "Invalid delta"}), 400
+    upserts, deletes = body.get('upserts') or [], body.get('deletes') or []
+    if not isinstance(upserts, list) or not all(isinstance(r, dict) for r in upserts):
+        return jsonify({"error": "Invalid delta"}), 400
+    if not isinstance(deletes, list) or not all(isinstance(fp, str) for fp in deletes):
+        return jsonify({"error": "Invalid delta"}), 400
+    started = time.perf_counter()
+    try:
+        upload = store.apply_delta(body['base'], upserts, deletes, expected=body.get('result'))
+    except DeltaConflict as e:
+        INGEST_FAILURES.inc('delta')
+        return jsonify({"error": str(e), "digest": e.digest}), 409
+    INGEST_SECONDS.observe(time.perf_counter() - started, 'delta')
+    INGEST_ROWS.inc('delta', amount=len(upserts))
+    return jsonify({"message": "Delta applied", "rows": upload['rows'], "digest": upload['digest']}), 200
+
+def _encode_rows(selection, ndjson):
+    """Serialise a Selection batch by batch: a JSON array, or one object per line."""
+    first = True
+    if not ndjson:
+        yield '['
+    for batch in selection.batches():
+        objs = [json.dumps(dict(zip(FIELDS, row))) for row in batch]
+        if ndjson:
+            yield '\n'.join(objs) + '\n'
+        else:
+            yield ('' if first else ', ') + ', '.join(objs)
+        first = False
+    if not ndjson:
+        yield ']'
+
+def _gzip_chunks(chunks, level=6):
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        out = z.compress(chunk.encode('utf-8'))
+        if out:
+            yield out
+    yield z.flush()
 
 @app.route('/jobs', methods=['GET'])
 def jobs():
-    if not os.path.exists(CSV_PATH):
-        return jsonify([])
-
-    # Read all lines as text so we can handle fully-quoted lines
-    with open(CSV_PATH, 'r', encoding='utf-8', newline='') as f:
-        # Strip CR/LF but keep content; ignore empty/whitespace-only lines
-        lines = [ln.rstrip('\r\n') for ln in f.readlines()]
-    if not lines:
-        return jsonify([])
-
-    def is_fully_quoted(s: str) -> bool:
-        s = s.strip()
-        return len(s) >= 2 and s.startswith('"') and s.endswith('"')
-
-    # Consider only non-empty lines for detection
-    nonempty = [ln for ln in lines if ln.strip() != '']
-
-    # CASE A: Fully-quoted lines where commas are inside the quotes (your sample)
-    if nonempty and all(is_fully_quoted(ln) for ln in nonempty):
-        # Unwrap quotes and split
-        header_raw = nonempty[0].strip()[1:-1]  # strip outer quotes
-        header = [h.strip().lower().replace('\ufeff', '') for h in header_raw.split(',')]
-
-        data_rows = []
-        for ln in nonempty[1:]:
-            row_raw = ln.strip()[1:-1]  # strip outer quotes
-            parts = [p.strip() for p in row_raw.split(',')]
-            data_rows.append(dict(zip(header, parts)))
+    """
+    Optional query params:
+      company, state  exact match (case-insensitive)
+      title           substring match (case-insensitive)
+      sort            company|title|location|state, prefix with '-' for descending
+      limit, offset   page window; `cursor` (from X-Next-Cursor) may replace offset
+      format=ndjson   one JSON object per line (also via Accept: application/x-ndjson)
+    The body is streamed straight off the database cursor; X-Total-Count carries
+    the match count. The ETag is the upload's data tag plus the representation
+    (json/ndjson, gzip/identity), so polls that find nothing new get a 304
+    without touching the rows.
+    """
+    args = request.args
+    filters = {k: args.get(k, '') for k in ('company', 'state', 'title')}
+    try:
+        offset = int(args.get('cursor') or args.get('offset') or 0)
+        limit = int(args['limit']) if args.get('limit') else None
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit/offset must be non-negative")
+        selection = store.select(sort=args.get('sort', ''), limit=limit, offset=offset, **filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    ndjson = args.get('format') == 'ndjson' or request.accept_mimetypes.best == NDJSON
+    gzipped = bool(request.accept_encodings['gzip'])
+    etag = f'{selection.tag}-{"ndjson" if ndjson else "json"}{"-gz" if gzipped else ""}'
+    if etag in request.if_none_match:
+        selection.close()
+        resp = Response(status=304)
+        resp.set_etag(etag)
+        return resp
+
+    try:
+        total = selection.total
+    except BaseException:
+        selection.close()
+        raise
+    body = _encode_rows(selection, ndjson)
+    resp = Response(mimetype=NDJSON if ndjson else 'application/json')
+    if gzipped:
+        resp.response = _gzip_chunks(body)
+        resp.headers['Content-Encoding'] = 'gzip'
     else:
-        # ... keep the rest of your existing code here (the Sniffer/DictReader path) ...
-        with open(CSV_PATH, 'r', encoding='utf-8', newline='') as f:
-            sample = f.read(4096)
-            f.seek(0)
-            try:
-                sniffer = csv.Sniffer()
-                dialect = sniffer.sniff(sample, delimiters=[',', ';', '\t', '|'])
-                has_header = sniffer.has_header(sample)
-            except Exception:
-                class _Dialect(csv.Dialect):
-                    delimiter = ','
-                    quotechar = '"'
-                    escapechar = None
-                    doublequote = True
-                    skipinitialspace = False
-                    lineterminator = '\n'
-                    quoting = csv.QUOTE_MINIMAL
-                dialect = _Dialect()
-                has_header = True
-
-            f.seek(0)
-            if has_header:
-                reader = csv.DictReader(f, dialect=dialect)
-                fieldnames = reader.fieldnames or []
-
-                # Normalize fieldnames (handle single combined header like "a,b,c")
-                if len(fieldnames) == 1 and ',' in fieldnames[0]:
-                    f.seek(0)
-                    first_line = f.readline()
-                    header = [h.strip().lower().replace('\ufeff', '') for h in first_line.split(',')]
-                    remainder = f.read().splitlines()
-                    reader = csv.DictReader(remainder, fieldnames=header, dialect=dialect)
-                    data_rows = list(reader)
-                else:
-                    data_rows = list(reader)
-            else:
-                # No header: map by index
-                f.seek(0)
-                row_reader = csv.reader(f, dialect=dialect)
-                items = []
-                for row in row_reader:
-                    def get_i(i): return row[i].strip() if i < len(row) else ''
-                    items.append({
-                        'company': get_i(0),
-                        'title': get_i(1),
-                        'location': get_i(2),
-                        'state': get_i(3),
-                    })
-                return jsonify(items)
-
-    # Normalize keys and map to the four fields we expose
-    def norm_key(k: str) -> str:
-        return (k or '').strip().lower().replace('\ufeff', '')
-
-    def pick(row: dict, candidates):
-        norm_map = {norm_key(k): k for k in row.keys()}
-        for key in candidates:
-            orig = norm_map.get(key)
-            if orig:
-                val = row.get(orig, '')
-                if val is not None and val != '':
-                    return str(val).strip()
-        return ''
-
-    company_keys  = ['company', 'employer', 'organization', 'org', 'companyname']
-    title_keys    = ['title', 'jobtitle', 'position', 'role']
-    location_keys = ['location', 'city', 'city/state', 'citystate', 'city, state']
-    state_keys    = ['state', 'st', 'province', 'region']
-
-    items = []
-    for r in data_rows:
-        items.append({
-            'company':  pick(r, company_keys),
-            'title':    pick(r, title_keys),
-            'location': pick(r, location_keys),
-            'state':    pick(r, state_keys),
-        })
-
-    return jsonify(items)
+        resp.response = (chunk.encode('utf-8') for chunk in body)
+    resp.call_on_close(selection.close)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'  # always revalidate, usually a 304
+    resp.headers['Vary'] = 'Accept, Accept-Encoding'
+    resp.headers['X-Total-Count'] = str(total)
+    end = offset + (total - offset if limit is None else limit)
+    if end < total:
+        resp.headers['X-Next-Cursor'] = str(end)
+    return resp
+
+@app.route('/jobs/facets', methods=['GET'])
+def job_facets():
+    """
+    Summary counts for the dashboard, honouring the /jobs filters (company, state, title):
+      {"version", "tag", "total", "state": [[value, count], ...], "company": [...],
+       "source_type": [...], "title_terms": [...]}
+    `top` caps each list (default 20). The ETag is the data tag, as for /jobs.
+    """
+    args = request.args
+    try:
+        top = int(args.get('top') or 20)
+        if top <= 0:
+            raise ValueError("top must be positive")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    facets = store.facets(top=top, **{k: args.get(k, '') for k in ('company', 'state', 'title')})
+
+    etag = facets['tag']
+    if etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        resp = jsonify(facets)
+        resp.headers['Cache-Control'] = 'no-cache'
+    resp.set_etag(etag)
+    return resp
 
 @app.route('/download', methods=['GET'])
 def download():
-    if os.path.exists(CSV_PATH):
-        return send_file(CSV_PATH, as_attachment=True)
-    return "No file", 404
+    """The current table as CSV, streamed straight out of the database."""
+    if store.latest() is None:
+        return "No file", 404
+    return Response(store.export_csv(), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=scraped_jobs.csv'})
 
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8080)
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape target: request latency per route, ingest timings and row counts, cache hits."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 @app.route('/debug-headers', methods=['GET'])
 def debug_headers():
-    """Return the raw CSV headers and a couple of raw rows so we can see exact keys."""
-    if not os.path.exists(CSV_PATH):
+    """Return the raw CSV headers and a couple of raw rows of the last upload so we can see exact keys."""
+    last = store.last_full_upload()
+    if last is None:
         return jsonify({"error": "no csv uploaded"}), 404
+    fieldnames, head = last
 
-    with open(CSV_PATH, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames or []
-
-        # Grab up to 2 raw rows to inspect keys/values
-        sample_rows = []
-        for i, row in enumerate(reader):
-            sample_rows.append(row)
-            if i >= 1:
-                break
+    # Grab up to 2 raw rows to inspect keys/values (only complete lines of the kept head)
+    lines = head.decode('utf-8', errors='replace').splitlines(keepends=True)
+    if len(head) >= KEEP_HEAD_BYTES:
+        lines = lines[:-1]  # probably cut in half
+    reader = csv.DictReader(lines)
+    sample_rows = []
+    for i, row in enumerate(reader):
+        sample_rows.append(row)
+        if i >= 1:
+            break
 
     return jsonify({
         "fieldnames": fieldnames,
@@ -161,27 +247,17 @@ def debug_headers():
 
 @app.route('/debug-raw', methods=['GET'])
 def debug_raw():
-    """Return the first few raw lines and byte markers to diagnose delimiter/BOM issues."""
-    if not os.path.exists(CSV_PATH):
+    """Return the first few raw lines and byte markers of the last upload to diagnose delimiter/BOM issues."""
+    last = store.last_full_upload()
+    if last is None:
         return jsonify({"error": "no csv uploaded"}), 404
+    _fieldnames, raw_bytes = last
 
-    # Read both bytes and text to inspect BOM & raw lines
-    try:
-        with open(CSV_PATH, 'rb') as fb:
-            raw_bytes = fb.read(200)  # first 200 bytes
-    except Exception as e:
-        return jsonify({"error": f"read-bytes failed: {e}"}), 500
-
-    try:
-        with open(CSV_PATH, 'r', encoding='utf-8', newline='') as ft:
-            lines = []
-            for _ in range(5):  # first 5 lines
-                line = ft.readline()
-                if not line:
-                    break
-                lines.append(line.rstrip('\n'))
-    except Exception as e:
-        return jsonify({"error": f"read-text failed: {e}"}), 500
+    lines = []
+    for line in io.StringIO(raw_bytes.decode('utf-8', errors='replace'), newline=''):
+        if len(lines) == 5:  # first 5 lines
+            break
+        lines.append(line.rstrip('\n'))
 
     # Hex preview of first up-to-80 bytes
     hex_preview = raw_bytes[:80].hex()
@@ -190,3 +266,6 @@ def debug_raw():
         "hex_preview_first_80_bytes": hex_preview,
         "raw_text_first_lines": lines
     })
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=8080)
@@ -1,26 +1,119 @@
-
 # career_scraper.py - Scrapes job titles, cities, and states from public career pages
+import csv, re, threading
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin
-import csv
+from urllib3.util.retry import Retry
+
+# The backend deploys on its own and doesn't import the automation package; the session
+# and state rules below are small copies of what the runner uses (keep them in step)
+HEADERS = {"User-Agent": "CareerScraperBot/1.0 (+contact: ops@example.com)"}
+
+STATE_NAMES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'FL': 'Florida', 'GA': 'Georgia',
+    'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois', 'IN': 'Indiana', 'IA': 'Iowa',
+    'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland',
+    'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota', 'MS': 'Mississippi', 'MO': 'Missouri',
+    'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada', 'NH': 'New Hampshire', 'NJ': 'New Jersey',
+    'NM': 'New Mexico', 'NY': 'New York', 'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio',
+    'OK': 'Oklahoma', 'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina',
+    'SD': 'South Dakota', 'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont',
+    'VA': 'Virginia', 'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+    'DC': 'District of Columbia',
+}
+# Same part-splitting and filler rules as automation/locations.py (normalize_location), minus
+# its city gazetteer: here a bare city ("Kalamazoo") gives no state
+_STATE_BY_NAME = {name.lower(): abbr for abbr, name in STATE_NAMES.items()}
+_STATE_BY_NAME.update({'washington dc': 'DC', 'washington d.c': 'DC', 'd.c': 'DC'})
+_COUNTRY = frozenset(['us', 'usa', 'u.s.', 'u.s.a.', 'united states', 'united states of america'])
+_REMOTE = re.compile(r"\b(?:remote|work from home|wfh|telecommute|anywhere|virtual)\b", re.I)
+_DOTTED_DC = re.compile(r"\bD\.\s?C\b\.?")
+_PARTS = re.compile(r"\s*(?:[,;|/()\[\]•–—]|\s-\s)\s*")
+_COUNTRY_STATE_CITY = re.compile(r"^(?:US|USA)-([A-Z]{2})-(.+)$")
+_TRAILING_ABBR = re.compile(r"^(.*?)[\s.]+([A-Z]{2})\.?$")
+_FILLER_WORDS = re.compile(
+    r"^(?:(?:(?i:hybrid|on-?site|based|only)|or|and|in|&)\s+)+"
+    r"|(?:\s+(?:(?i:hybrid|on-?site|based|only|preferred)|or|and|&|\d{5}(?:-\d{4})?))+$")
+_NOT_A_PLACE = frozenset(['hybrid', 'onsite', 'on-site', 'multiple locations', 'various locations',
+                          'nationwide', 'flexible', 'tbd', 'or', 'and', 'in', '&'])
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Pooled keep-alive session that retries connection errors, 429 and 5xx with backoff."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=frozenset({"GET", "HEAD"}), respect_retry_after_header=True,
+                              raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+                s = requests.Session()
+                s.headers.update(HEADERS)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _session = s
+    return _session
+
+
+def _part_state(part):
+    if part in STATE_NAMES:  # abbreviations only count in capitals ("IN", not "in")
+        return part
+    return _STATE_BY_NAME.get(part.lower().rstrip('.'), '')
+
+
+def _trailing_state(part):
+    """State at the end of a city part: "Ann Arbor MI", "Ann Arbor Michigan"."""
+    m = _TRAILING_ABBR.match(part)
+    if m and m.group(2) in STATE_NAMES:
+        return m.group(2)
+    words = part.split()
+    for n in (3, 2, 1):
+        if len(words) > n and ' '.join(words[-n:]).lower() in _STATE_BY_NAME:
+            return _STATE_BY_NAME[' '.join(words[-n:]).lower()]
+    return ''
+
+
+def state_of(text):
+    """Two-letter state named in free-form location text ("Detroit, Michigan", "Troy MI", "US-MI-Detroit")."""
+    text = _DOTTED_DC.sub('DC', _REMOTE.sub(' ', text or '')).strip()
+    m = _COUNTRY_STATE_CITY.match(text)
+    if m and m.group(1) in STATE_NAMES:
+        return m.group(1)
+    # A part that is a state wins (the last one); otherwise the state ending the first place
+    state, place = '', None
+    for part in _PARTS.split(text):
+        part = _FILLER_WORDS.sub('', part.strip(' .-'))
+        st = _part_state(part)
+        if st:
+            state = st
+        elif place is None and part and part.lower() not in _NOT_A_PLACE and part.lower() not in _COUNTRY:
+            place = part
+    return state or (_trailing_state(place) if place else '')
 
 
 def scrape_career_page(company_name, base_url, job_list_path, job_title_selector, location_selector, state=None):
     try:
-        response = requests.get(urljoin(base_url, job_list_path), timeout=10)
+        response = get_session().get(urljoin(base_url, job_list_path), timeout=10)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
 
         job_titles = [job.get_text(strip=True) for job in soup.select(job_title_selector)]
         locations = [loc.get_text(strip=True) for loc in soup.select(location_selector)]
 
+        # The page's own location wins; the configured state only fills the gaps
+        default_state = (state_of(state) or state) if state else ""
         jobs = list(zip(job_titles, locations))
         return [{
             "company": company_name,
             "title": j[0],
             "location": j[1],
-            "state": state if state else ""
+            "state": state_of(j[1]) or default_state
         } for j in jobs]
 
     except Exception as e:
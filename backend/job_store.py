@@ -0,0 +1,608 @@
+# job_store.py - SQLite-backed job table shared by the upload and read routes
+import csv, gzip, hashlib, io, itertools, json, os, re, sqlite3, threading, time
+from collections import Counter, OrderedDict
+from urllib.parse import urlsplit
+
+FIELDS = ('company', 'title', 'location', 'state')
+# Rows also carry source_url (not exposed by /jobs) so they can be fingerprinted
+ROW_FIELDS = FIELDS + ('source_url',)
+
+# Header aliases we accept for each exposed field (first non-empty match wins)
+company_keys  = ['company', 'employer', 'organization', 'org', 'companyname']
+title_keys    = ['title', 'jobtitle', 'position', 'role']
+location_keys = ['location', 'city', 'city/state', 'citystate', 'city, state']
+state_keys    = ['state', 'st', 'province', 'region']
+source_keys   = ['source_url', 'url', 'link', 'joburl', 'job_url']
+HEADER_KEYS = frozenset(company_keys + title_keys + location_keys + state_keys + source_keys)
+
+
+HEAD_BYTES = 64 * 1024   # first block used for dialect/header detection
+CHUNK_BYTES = 256 * 1024  # read size while streaming an upload
+KEEP_HEAD_BYTES = 4096    # raw bytes of each upload kept for /debug-headers and /debug-raw
+# Readers map the database file instead of copying pages into each connection's cache:
+# every worker (and thread) shares the OS page cache, so a cold start reads nothing up front
+# and per-process memory doesn't grow with the table. SQLite caps it at its own limit.
+MMAP_BYTES = 1 << 30
+
+
+def norm_key(k: str) -> str:
+    return (k or '').strip().lower().replace('\ufeff', '')
+
+
+def _job(company, title, location, state, source_url=''):
+    return (company, title, location, state, source_url)
+
+
+def fingerprint(job):
+    """
+    Stable identity of a posting. Must stay in sync with automation/delta.py
+    (job_fingerprint), which computes the same value on the runner side.
+    """
+    company, title, location, _state, source_url = job
+    key = '\x1f'.join([
+        company.strip().lower(),
+        ' '.join(title.lower().split()),
+        ' '.join(location.lower().split()),
+        source_url.strip(),
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def source_type(url):
+    """Which kind of board a posting came from: greenhouse, lever, generic (or unknown)."""
+    try:
+        host = urlsplit((url or '').strip()).hostname or ''
+    except ValueError:  # e.g. an unclosed IPv6 bracket; one bad row mustn't fail the upload
+        return 'unknown'
+    if not host:
+        return 'unknown'
+    if host == 'greenhouse.io' or host.endswith('.greenhouse.io'):
+        return 'greenhouse'
+    if host == 'lever.co' or host.endswith('.lever.co'):
+        return 'lever'
+    return 'generic'
+
+
+_TERM = re.compile(r"[a-z][a-z0-9+#]*")
+STOP_TERMS = frozenset('a an and at for in of on or the to with'.split())
+
+
+def title_terms(title):
+    """Distinct lowercase words of a title, minus filler words, for the title_terms facet."""
+    return {t for t in _TERM.findall(title.lower()) if len(t) > 1 and t not in STOP_TERMS}
+
+
+# Current upload id plus what identifies it beyond this file: ids restart at 1 whenever
+# jobs.db is recreated (fresh disk, redeploy, another JOBS_DB_PATH), so the id alone can
+# hand a client holding "v1" from the old database a 304 for different data
+DATA_TAG_SQL = ("SELECT coalesce(max(id), 0), "
+                "coalesce((SELECT uploaded_at || ':' || digest FROM uploads ORDER BY id DESC LIMIT 1), '') "
+                "FROM uploads")
+
+def data_tag(version, identity):
+    return f'v{version}-' + hashlib.sha1(f'{version}:{identity}'.encode('utf-8')).hexdigest()[:12]
+
+def snapshot_digest(fingerprints):
+    """Order-independent digest of a set of fingerprints (XOR), so both sides can compare snapshots."""
+    acc = 0
+    for fp in set(fingerprints):
+        acc ^= int(fp, 16)
+    return f'{acc:016x}'
+
+
+def _picker(header):
+    """
+    Resolve the header aliases once per file instead of once per row.
+    Returns a function mapping a raw row (list of cells) to a job tuple.
+    """
+    positions = {}
+    for i, name in enumerate(header):
+        positions[norm_key(name)] = i  # last duplicate wins, like DictReader
+
+    def columns(candidates):
+        return [positions[k] for k in candidates if k in positions]
+
+    cols = [columns(company_keys), columns(title_keys), columns(location_keys), columns(state_keys),
+            columns(source_keys)]
+
+    def pick(row):
+        out = []
+        for candidates in cols:
+            val = ''
+            for i in candidates:
+                if i < len(row) and row[i] != '':
+                    val = row[i].strip()
+                    break
+            out.append(val)
+        return _job(*out)
+
+    return pick
+
+
+def iter_jobs(f):
+    """
+    Stream (company, title, location, state, source_url) tuples out of a text-mode CSV.
+
+    Only the first block is buffered, to decide between the fully-quoted,
+    Sniffer/header and no-header layouts; the rest is read line by line.
+    """
+    head = f.read(HEAD_BYTES)
+    if not head.endswith('\n'):
+        # Finish the line we cut in half; a head ending in '\r' may be the first half of '\r\n'
+        head += f.readline()
+    lines = itertools.chain(io.StringIO(head), f)
+
+    def is_fully_quoted(s: str) -> bool:
+        s = s.strip()
+        return len(s) >= 2 and s.startswith('"') and s.endswith('"')
+
+    # Consider only non-empty lines for detection
+    nonempty = [ln for ln in head.splitlines() if ln.strip() != '']
+    if not nonempty:
+        return
+
+    # CASE A: Fully-quoted lines where commas are inside the quotes
+    if all(is_fully_quoted(ln) for ln in nonempty):
+        header = None
+        for ln in lines:
+            if ln.strip() == '':
+                continue
+            parts = [p.strip() for p in ln.strip()[1:-1].split(',')]  # strip outer quotes
+            if header is None:
+                header = [h.lower() for h in parts]
+                pick = _picker(header)
+            else:
+                yield pick(parts)
+        return
+
+    # CASE B: Regular CSV; let the Sniffer work out delimiter and header
+    sample = head[:4096]
+    try:
+        sniffer = csv.Sniffer()
+        dialect = sniffer.sniff(sample, delimiters=[',', ';', '\t', '|'])
+        has_header = sniffer.has_header(sample)
+    except Exception:
+        class _Dialect(csv.Dialect):
+            delimiter = ','
+            quotechar = '"'
+            escapechar = None
+            doublequote = True
+            skipinitialspace = False
+            lineterminator = '\n'
+            quoting = csv.QUOTE_MINIMAL
+        dialect = _Dialect()
+        has_header = True
+    if not has_header:
+        # The Sniffer guesses from types and lengths, so an all-text file (like the runner's own
+        # company,title,location,state,source_url) can look headerless; known names settle it
+        first = next(csv.reader([nonempty[0]], dialect=dialect), [])
+        has_header = bool(first) and all(norm_key(k) in HEADER_KEYS for k in first)
+
+    if not has_header:
+        # No header: map by index
+        pick = _picker(list(ROW_FIELDS))
+        for row in csv.reader(lines, dialect=dialect):
+            if row:
+                yield pick(row)
+        return
+
+    first_line = next(lines)
+    header = next(csv.reader([first_line], dialect=dialect), [])
+    # Normalize fieldnames (handle single combined header like "a,b,c")
+    if len(header) == 1 and ',' in header[0]:
+        header = first_line.split(',')
+    pick = _picker(header)
+    for row in csv.reader(lines, dialect=dialect):
+        if row:  # DictReader skips blank lines too
+            yield pick(row)
+
+
+class _HeadReader(io.RawIOBase):
+    """Raw binary reader that keeps the first `limit` bytes it passes through."""
+
+    def __init__(self, src, limit=KEEP_HEAD_BYTES):
+        self.src = src
+        self.limit = limit
+        self.head = bytearray()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self.src.read(len(b))
+        if len(self.head) < self.limit:
+            self.head += data[:self.limit - len(self.head)]
+        b[:len(data)] = data
+        return len(data)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY,
+    company     TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    location    TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    source_url  TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    source_type TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS jobs_company ON jobs (company COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS jobs_fingerprint ON jobs (fingerprint);
+
+-- Facet counts over the whole table, kept current by every full and delta upload
+CREATE TABLE IF NOT EXISTS facet_counts (
+    facet TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (facet, value)
+);
+
+CREATE TABLE IF NOT EXISTS uploads (
+    id          INTEGER PRIMARY KEY,
+    uploaded_at REAL NOT NULL,
+    kind        TEXT NOT NULL,      -- 'full' or 'delta'
+    rows        INTEGER NOT NULL,
+    digest      TEXT NOT NULL,
+    fieldnames  TEXT,               -- JSON list, full uploads only
+    head        BLOB                -- first KEEP_HEAD_BYTES of the raw CSV, full uploads only
+);
+"""
+
+# Trigram FTS over titles so "title contains" doesn't scan the table (needs SQLite >= 3.34)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_title USING fts5 (
+    title, content='jobs', content_rowid='id', tokenize='trigram'
+);
+"""
+
+INSERT_JOB = ('INSERT INTO jobs (company, title, location, state, source_url, fingerprint, source_type) '
+              'VALUES (?, ?, ?, ?, ?, ?, ?)')
+FACETS = ('state', 'company', 'source_type', 'title_terms')
+FACET_CACHE_SIZE = 256
+
+
+def _db_row(job):
+    return (*job, fingerprint(job), source_type(job[4]))
+
+
+class FacetCounter:
+    """Facet counts accumulated row by row while an upload streams in (or is undone by a delta)."""
+
+    def __init__(self):
+        self.counts = {facet: Counter() for facet in FACETS}
+
+    def add(self, company, title, state, source, n=1):
+        self.counts['company'][company] += n
+        self.counts['state'][state] += n
+        self.counts['source_type'][source] += n
+        for term in title_terms(title):
+            self.counts['title_terms'][term] += n
+
+    def counting(self, rows):
+        """Pass database rows (see _db_row) through, counting them on the way."""
+        for row in rows:
+            self.add(row[0], row[1], row[3], row[6])
+            yield row
+
+    def save(self, conn, replace=False):
+        if replace:
+            conn.execute('DELETE FROM facet_counts')
+        conn.executemany(
+            'INSERT INTO facet_counts (facet, value, count) VALUES (?, ?, ?) '
+            'ON CONFLICT (facet, value) DO UPDATE SET count = count + excluded.count',
+            ((facet, value, n) for facet, counts in self.counts.items() for value, n in counts.items() if n))
+        conn.execute('DELETE FROM facet_counts WHERE count <= 0')
+
+
+class Selection:
+    """
+    One read transaction on its own connection, so a streamed response sees a
+    single upload from the first row to the last even if another one commits
+    meanwhile. Always close() it (streaming responses do so when they finish).
+    """
+
+    BATCH = 500
+
+    def __init__(self, conn, where, params, order, limit, offset, fields):
+        self._conn = conn
+        self._sql = (f'SELECT {", ".join(fields)} FROM jobs{where} ORDER BY {order} LIMIT ? OFFSET ?',
+                     params + [-1 if limit is None else limit, offset])
+        self._count_sql = (f'SELECT count(*) FROM jobs{where}', params)
+        conn.execute('BEGIN')
+        self.version, identity = conn.execute(DATA_TAG_SQL).fetchone()
+        self.tag = data_tag(self.version, identity)
+        self._total = None
+
+    @property
+    def total(self):
+        """Number of matches, ignoring limit/offset."""
+        if self._total is None:
+            self._total = self._conn.execute(*self._count_sql).fetchone()[0]
+        return self._total
+
+    def batches(self, size=BATCH):
+        cur = self._conn.execute(*self._sql)
+        while True:
+            batch = cur.fetchmany(size)
+            if not batch:
+                return
+            yield batch
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()  # ends the read transaction
+            self._conn = None
+
+
+class DeltaConflict(Exception):
+    """The client's snapshot doesn't match ours; it should fall back to a full upload."""
+
+    def __init__(self, digest):
+        super().__init__(f'snapshot mismatch (server digest {digest})')
+        self.digest = digest
+
+
+class JobStore:
+    """
+    The normalised job table in an SQLite database (WAL mode).
+
+    Uploads replace the table inside one write transaction; readers keep
+    seeing the previous upload until it commits, so requests on other threads
+    and gunicorn workers never block on an ingest or see half of one. Each
+    upload (full or delta) is recorded in `uploads`; its id is the data version.
+    """
+
+    def __init__(self, path, mmap_bytes=MMAP_BYTES):
+        self.path = path
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        self._facet_cache = OrderedDict()  # (data tag, filters, top) -> facets dict
+        self.facet_cache_hits = self.facet_cache_misses = 0
+        self._facet_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        if 'source_type' not in {col[1] for col in conn.execute('PRAGMA table_info(jobs)')}:
+            self._add_source_type(conn)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False  # no FTS5/trigram in this SQLite build; title search falls back to LIKE
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_bytes)}')
+        return conn
+
+    def _conn(self):
+        # One connection per thread, and never one inherited across a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _add_source_type(self, conn):
+        # Databases created before facets: add the column and count what's already there
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute("ALTER TABLE jobs ADD COLUMN source_type TEXT NOT NULL DEFAULT ''")
+            rows = conn.execute('SELECT id, source_url FROM jobs').fetchall()
+            conn.executemany('UPDATE jobs SET source_type = ? WHERE id = ?', ((source_type(u), i) for i, u in rows))
+            counter = FacetCounter()
+            for company, title, state, source in conn.execute('SELECT company, title, state, source_type FROM jobs'):
+                counter.add(company, title, state, source)
+            counter.save(conn, replace=True)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def latest(self):
+        """The current upload as a dict (version, uploaded_at, kind, rows, digest), or None."""
+        row = self._conn().execute(
+            'SELECT id, uploaded_at, kind, rows, digest FROM uploads ORDER BY id DESC LIMIT 1').fetchone()
+        if row is None:
+            return None
+        return dict(zip(('version', 'uploaded_at', 'kind', 'rows', 'digest'), row))
+
+    def last_full_upload(self):
+        """(fieldnames, head bytes) of the most recent full upload, for the debug routes."""
+        row = self._conn().execute(
+            "SELECT fieldnames, head FROM uploads WHERE kind = 'full' ORDER BY id DESC LIMIT 1").fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0] or '[]'), bytes(row[1] or b'')
+
+    def _where(self, company='', state='', title=''):
+        clauses, params = [], []
+        company, state, title = company.strip(), state.strip(), title.strip()
+        if company:
+            clauses.append('company = ? COLLATE NOCASE')
+            params.append(company)
+        if state:
+            clauses.append('state = ? COLLATE NOCASE')
+            params.append(state)
+        if title:
+            if self.fts and len(title) >= 3:
+                clauses.append('id IN (SELECT rowid FROM jobs_title WHERE jobs_title MATCH ?)')
+                params.append('"' + title.replace('"', '""') + '"')
+            else:
+                # Too short for a trigram (or no FTS): plain substring scan
+                clauses.append("title LIKE ? ESCAPE '\\'")
+                params.append('%' + title.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def select(self, company='', state='', title='', sort='', limit=None, offset=0, fields=FIELDS):
+        """
+        Open a Selection of the matching jobs (tuples in `fields` order).
+        `sort` is `field` or `-field`; ties keep upload order.
+        """
+        order = 'id'
+        if sort:
+            field = sort.lstrip('-')
+            if field not in FIELDS:
+                raise ValueError(f"unknown sort field: {field}")
+            direction = 'DESC' if sort.startswith('-') else 'ASC'
+            order = f'{field} COLLATE NOCASE {direction}, id'
+        where, params = self._where(company, state, title)
+        return Selection(self._connect(), where, params, order, limit, offset, fields)
+
+    def facets(self, company='', state='', title='', top=20):
+        """
+        Counts by state, company and source_type plus the top title terms, for
+        the jobs matching the same filters as /jobs. Unfiltered counts come
+        straight from facet_counts (maintained at ingest); filtered ones are
+        grouped on demand. Either way the result is cached per upload version.
+        """
+        conn = self._conn()
+        conn.execute('BEGIN')
+        try:
+            version, identity = conn.execute(DATA_TAG_SQL).fetchone()
+            tag = data_tag(version, identity)
+            key = (tag, company.strip().lower(), state.strip().lower(), title.strip().lower(), top)
+            with self._facet_lock:
+                cached = self._facet_cache.get(key)
+                if cached is not None:
+                    self.facet_cache_hits += 1
+                    self._facet_cache.move_to_end(key)
+                    return cached
+                self.facet_cache_misses += 1
+
+            if any(key[1:4]):
+                where, params = self._where(company, state, title)
+                total = conn.execute(f'SELECT count(*) FROM jobs{where}', params).fetchone()[0]
+                result = {}
+                for facet in ('state', 'company', 'source_type'):
+                    result[facet] = [list(r) for r in conn.execute(
+                        f'SELECT {facet}, count(*) AS n FROM jobs{where} GROUP BY {facet} '
+                        f'ORDER BY n DESC, {facet} LIMIT ?', params + [top])]
+                terms = Counter()
+                for (t,) in conn.execute(f'SELECT title FROM jobs{where}', params):
+                    terms.update(title_terms(t))
+                result['title_terms'] = [[v, c] for v, c in sorted(terms.items(), key=lambda t: (-t[1], t[0]))[:top]]
+            else:
+                total = conn.execute('SELECT count(*) FROM jobs').fetchone()[0]
+                result = {facet: [list(r) for r in conn.execute(
+                    'SELECT value, count FROM facet_counts WHERE facet = ? ORDER BY count DESC, value LIMIT ?',
+                    (facet, top))] for facet in FACETS}
+        finally:
+            conn.execute('COMMIT')
+
+        result = {'version': version, 'tag': tag, 'total': total, **result}
+        with self._facet_lock:
+            self._facet_cache[key] = result
+            while len(self._facet_cache) > FACET_CACHE_SIZE:
+                self._facet_cache.popitem(last=False)
+        return result
+
+    def export_csv(self):
+        """Yield the table as CSV text, a chunk at a time (for /download)."""
+        selection = self.select(fields=ROW_FIELDS)
+        try:
+            buf = io.StringIO()
+            w = csv.writer(buf)
+            w.writerow(ROW_FIELDS)
+            for batch in selection.batches():
+                w.writerows(batch)
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            if buf.tell():
+                yield buf.getvalue()
+        finally:
+            selection.close()
+
+    def _digest(self, conn):
+        return snapshot_digest(fp for (fp,) in conn.execute('SELECT DISTINCT fingerprint FROM jobs'))
+
+    def _record(self, conn, kind, digest, fieldnames=None, head=None):
+        rows = conn.execute('SELECT count(*) FROM jobs').fetchone()[0]
+        conn.execute(
+            'INSERT INTO uploads (uploaded_at, kind, rows, digest, fieldnames, head) VALUES (?, ?, ?, ?, ?, ?)',
+            (time.time(), kind, rows, digest, None if fieldnames is None else json.dumps(fieldnames), head))
+        return self.latest()
+
+    def ingest(self, stream, gzipped=False, if_empty=False):
+        """
+        Stream an uploaded CSV (optionally gzip-compressed) into the table.
+
+        The body is decompressed on the fly and normalised row by row (header
+        aliases included) straight into one bulk insert; the old rows are
+        replaced in the same transaction. Returns the new upload record, or
+        None when `if_empty` is set and something was already uploaded (checked
+        under the write lock, so racing workers import once).
+        """
+        src = gzip.GzipFile(fileobj=stream, mode='rb') if gzipped else stream
+        reader = _HeadReader(src)
+        raw = io.BufferedReader(reader, CHUNK_BYTES)
+        text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if if_empty and conn.execute('SELECT 1 FROM uploads LIMIT 1').fetchone():
+                conn.execute('ROLLBACK')
+                return None
+            conn.execute('DELETE FROM jobs')
+            counter = FacetCounter()
+            conn.executemany(INSERT_JOB, counter.counting(_db_row(job) for job in iter_jobs(text)))
+            counter.save(conn, replace=True)
+            if self.fts:
+                conn.execute("INSERT INTO jobs_title (jobs_title) VALUES ('rebuild')")
+            head = bytes(reader.head)
+            first = head.decode('utf-8', errors='replace').splitlines()[:1]
+            fieldnames = next(csv.reader(first), [])
+            upload = self._record(conn, 'full', self._digest(conn), fieldnames, head)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return upload
+
+    def apply_delta(self, base, upserts, deletes, expected=None):
+        """
+        Apply a runner-computed delta on top of the current snapshot.
+
+        `base` must equal our current digest, otherwise DeltaConflict is raised
+        and nothing changes. Rows whose fingerprint is deleted or re-sent are
+        removed and the upserts inserted, all in one transaction. When
+        `expected` is given the resulting digest must match it too.
+        """
+        new_jobs = [_job(*(str(row.get(f) or '').strip() for f in ROW_FIELDS)) for row in upserts]
+        new_rows = [_db_row(job) for job in new_jobs]
+        replaced = [(fp,) for fp in set(deletes) | {r[5] for r in new_rows}]
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')  # holds the write lock, so `base` can't move under us
+        try:
+            latest = self.latest()
+            current = latest['digest'] if latest else snapshot_digest([])
+            if base != current:
+                raise DeltaConflict(current)
+            if self.fts:
+                conn.executemany(
+                    "INSERT INTO jobs_title (jobs_title, rowid, title) "
+                    "SELECT 'delete', id, title FROM jobs WHERE fingerprint = ?", replaced)
+            counter = FacetCounter()
+            for (fp,) in replaced:
+                for company, title, state, source in conn.execute(
+                        'SELECT company, title, state, source_type FROM jobs WHERE fingerprint = ?', (fp,)):
+                    counter.add(company, title, state, source, -1)
+            conn.executemany('DELETE FROM jobs WHERE fingerprint = ?', replaced)
+            for row in counter.counting(new_rows):
+                cur = conn.execute(INSERT_JOB, row)
+                if self.fts:
+                    conn.execute('INSERT INTO jobs_title (rowid, title) VALUES (?, ?)', (cur.lastrowid, row[1]))
+            counter.save(conn)
+            digest = self._digest(conn)
+            if expected and digest != expected:
+                raise DeltaConflict(digest)
+            upload = self._record(conn, 'delta', digest)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return upload
@@ -0,0 +1,103 @@
+# backend/metrics.py - Prometheus text exposition without the client library
+# Values live in this process: under several gunicorn workers each one reports its own.
+import threading
+
+REGISTRY = []
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; the usual Prometheus defaults, plus a longer tail for full uploads
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join('{}="{}"'.format(n, str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+                     for n, v in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name, doc, labels=()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.doc}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    """inc() it, or pass `fn` to read a value something else already counts at scrape time."""
+    kind = 'counter'
+
+    def __init__(self, name, doc, labels=(), fn=None):
+        super().__init__(name, doc, labels)
+        self.fn = fn
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        if self.fn is not None:
+            value = self.fn()
+            if value is not None:
+                self.set(value)
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f'{self.name}{_labels(self.labels, k)} {v}' for k, v in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, doc, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += 1
+            state[2] += value
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._values.items())
+        lines = self.header()
+        names = self.labels + ('le',)
+        for k, (counts, count, total) in items:
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{_labels(names, k + (repr(bound),))} {n}')
+            lines.append(f'{self.name}_bucket{_labels(names, k + ("+Inf",))} {count}')
+            lines.append(f'{self.name}_count{_labels(self.labels, k)} {count}')
+            lines.append(f'{self.name}_sum{_labels(self.labels, k)} {total}')
+        return lines
+
+
+def render():
+    """Every registered metric in the Prometheus text format (version 0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
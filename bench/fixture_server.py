@@ -0,0 +1,142 @@
+# bench/fixture_server.py - Local stand-ins for Greenhouse, Lever, generic career pages and Bing
+import json, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+TITLES = ["Software Engineer", "Event Coordinator", "Line Cook", "Security Officer", "Data Analyst",
+          "Box Office Associate", "Marketing Manager", "Stagehand", "Bartender", "Facilities Technician"]
+LEVELS = ["", "Senior ", "Lead ", "Part-Time ", "Assistant "]
+CITIES = ["Detroit, MI", "Grand Rapids, MI", "Ann Arbor, Michigan", "Indianapolis, IN", "Fort Wayne, Indiana",
+          "Chicago, IL", "Remote - US", "Columbus, OH", "Lansing, MI", "South Bend, IN"]
+
+
+class Fixtures:
+    """
+    Deterministic synthetic boards: every slug has `jobs_per_target` postings.
+    `latency` (seconds, plus up to `jitter`) is slept before each response and
+    generic pages are padded with `pad_bytes` of script noise, like real pages.
+    """
+
+    def __init__(self, jobs_per_target=100, latency=0.0, jitter=0.0, pad_bytes=50_000, seed=1):
+        self.jobs_per_target = jobs_per_target
+        self.latency = latency
+        self.jitter = jitter
+        self.pad_bytes = pad_bytes
+        self.seed = seed
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def jobs(self, slug):
+        rng = random.Random(f"{self.seed}:{slug}")
+        return [(f"{rng.choice(LEVELS)}{rng.choice(TITLES)} {i}", rng.choice(CITIES))
+                for i in range(self.jobs_per_target)]
+
+    def greenhouse(self, slug, base):
+        return {"jobs": [{"id": i, "title": t, "location": {"name": loc},
+                          "absolute_url": f"{base}/greenhouse/{slug}/jobs/{i}"}
+                         for i, (t, loc) in enumerate(self.jobs(slug))],
+                "meta": {"total": self.jobs_per_target}}
+
+    def lever(self, slug, base, skip, limit):
+        return [{"id": f"{slug}-{i}", "text": t, "categories": {"location": loc},
+                 "hostedUrl": f"{base}/lever/{slug}/{i}"}
+                for i, (t, loc) in enumerate(self.jobs(slug))][skip:skip + limit]
+
+    def careers_page(self, slug):
+        items = "\n".join(f'<li class="job"><h3 class="job-title">{t}</h3><span class="job-location">{loc}</span></li>'
+                          for t, loc in self.jobs(slug))
+        pad = "<script>var x = '" + "x" * max(0, self.pad_bytes) + "';</script>"
+        return (f"<!doctype html><html><head><title>{slug} careers</title>{pad}</head>"
+                f"<body><nav>menu</nav><ul class=\"jobs\">\n{items}\n</ul></body></html>")
+
+    def search(self, query, count):
+        rng = random.Random(f"{self.seed}:q:{query}")
+        value = []
+        for i in range(count):
+            kind = rng.choice(["greenhouse", "lever", "other"])
+            slug = f"co{rng.randrange(10_000)}"
+            url = {"greenhouse": f"https://boards.greenhouse.io/{slug}",
+                   "lever": f"https://jobs.lever.co/{slug}",
+                   "other": f"https://www.{slug}.example.com/careers"}[kind]
+            value.append({"name": f"{slug} careers", "url": url, "snippet": query})
+        return {"webPages": {"value": value}}
+
+
+def _handler(fixtures):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real sites
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, ctype):
+            data = body if isinstance(body, bytes) else body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            with fixtures._lock:
+                fixtures.requests += 1
+            if fixtures.latency or fixtures.jitter:
+                time.sleep(fixtures.latency + random.random() * fixtures.jitter)
+            parts = urlsplit(self.path)
+            path = parts.path.strip("/").split("/")
+            qs = {k: v[0] for k, v in parse_qs(parts.query).items()}
+            base = f"http://{self.headers.get('Host', '127.0.0.1')}"
+            if len(path) == 3 and path[0] == "greenhouse" and path[2] == "jobs":
+                return self._send(200, json.dumps(fixtures.greenhouse(path[1], base)), "application/json")
+            if len(path) == 2 and path[0] == "lever":
+                page = fixtures.lever(path[1], base, int(qs.get("skip", 0)), int(qs.get("limit", 100)))
+                return self._send(200, json.dumps(page), "application/json")
+            if len(path) == 2 and path[0] == "careers":
+                return self._send(200, fixtures.careers_page(path[1]), "text/html; charset=utf-8")
+            if path[0] == "bing":
+                result = fixtures.search(qs.get("q", ""), int(qs.get("count", 20)))
+                return self._send(200, json.dumps(result), "application/json")
+            self._send(404, "not found", "text/plain")
+
+    return Handler
+
+
+def start(fixtures, hosts=1, port=0):
+    """
+    Serve `fixtures` on 127.0.0.1 .. 127.0.0.<hosts> (same port) in daemon
+    threads, so targets land in separate per-host lanes. Returns
+    (["http://127.0.0.N:port", ...], servers); addresses the OS won't bind
+    (only 127.0.0.1 exists on macOS by default) are skipped.
+    """
+    servers, bases = [], []
+    for n in range(1, hosts + 1):
+        try:
+            server = ThreadingHTTPServer((f"127.0.0.{n}", port), _handler(fixtures))
+        except OSError:
+            if n == 1:
+                raise
+            continue
+        server.daemon_threads = True
+        port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        bases.append(f"http://127.0.0.{n}:{port}")
+    return bases, servers
+
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser(description="Serve synthetic job boards for local runs.")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--jobs-per-target", type=int, default=100)
+    p.add_argument("--latency-ms", type=float, default=0)
+    p.add_argument("--pad-kb", type=float, default=50)
+    args = p.parse_args()
+    bases, _ = start(Fixtures(args.jobs_per_target, args.latency_ms / 1000, pad_bytes=int(args.pad_kb * 1024)),
+                     port=args.port)
+    print(f"[BENCH] Serving fixtures on {bases[0]} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
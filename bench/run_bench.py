@@ -0,0 +1,278 @@
+# bench/run_bench.py - Offline benchmarks for the scraper, discovery and the backend
+"""
+Run from the repo root:
+
+    python -m bench.run_bench                      # 1k, 10k and 100k rows, JSON to stdout
+    python -m bench.run_bench --scales 1000 --out bench/results/today.json
+    python -m bench.run_bench --compare bench/results/yesterday.json --out bench/results/today.json
+
+Every (scenario, scale) runs in its own subprocess so peak RSS belongs to that
+scenario alone. Nothing leaves the machine: the fixture server stands in for
+Greenhouse, Lever, generic career pages and Bing, and the backend is driven
+through Flask's test client against a throwaway database.
+"""
+import argparse, csv, io, json, os, platform, resource, subprocess, sys, tempfile, threading, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ("scrape", "discovery", "backend")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def latency_summary(seconds):
+    return {"count": len(seconds),
+            "p50_ms": round(percentile(seconds, 50) * 1000, 3) if seconds else None,
+            "p95_ms": round(percentile(seconds, 95) * 1000, 3) if seconds else None}
+
+
+def peak_rss_kb():
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 if sys.platform == "darwin" else 1
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale
+    return own, children
+
+
+def _start_fixtures(args):
+    from bench.fixture_server import Fixtures, start
+    fixtures = Fixtures(args.jobs_per_target, args.latency_ms / 1000, args.jitter_ms / 1000,
+                        pad_bytes=int(args.pad_kb * 1024))
+    bases, _servers = start(fixtures, hosts=args.hosts)
+    return fixtures, bases
+
+
+def _point_automation_at(bases, tmp):
+    # Must happen before the automation modules are imported: they read these at import time
+    os.environ["GREENHOUSE_API"] = bases[0] + "/greenhouse/{slug}/jobs"
+    os.environ["LEVER_API"] = bases[-1] + "/lever/{slug}"
+    os.environ["BING_ENDPOINT"] = bases[0] + "/bing"
+    os.environ["BING_API_KEY"] = "bench"
+    os.environ["SCRAPER_CACHE_DIR"] = str(Path(tmp) / "http-cache")
+    os.environ["DISCOVERY_CACHE_PATH"] = str(Path(tmp) / "search_cache.json")
+    os.environ["SCRAPER_STATE_DIR"] = str(Path(tmp) / "state")
+
+
+def _record_latencies():
+    """Client-side time to response headers for every request on the shared session."""
+    from automation import http_client
+    seconds = []
+    lock = threading.Lock()
+
+    def hook(resp, *args, **kwargs):
+        with lock:
+            seconds.append(resp.elapsed.total_seconds())
+    http_client.get_session().hooks["response"].append(hook)
+    return seconds
+
+
+def bench_scrape(rows, args, tmp):
+    fixtures, bases = _start_fixtures(args)
+    _point_automation_at(bases, tmp)
+    from automation.scraper_core import scrape_from_config
+    latencies = _record_latencies()
+
+    targets = max(1, rows // args.jobs_per_target)
+    config = []
+    for i in range(targets):
+        kind = ("greenhouse", "lever", "generic")[i % 3]
+        if kind == "greenhouse":
+            config.append({"company": f"GH {i}", "type": kind, "url": f"https://boards.greenhouse.io/co{i}"})
+        elif kind == "lever":
+            config.append({"company": f"Lever {i}", "type": kind, "url": f"https://jobs.lever.co/co{i}"})
+        else:
+            config.append({"company": f"Site {i}", "type": kind, "url": f"{bases[i % len(bases)]}/careers/co{i}",
+                           "title_selector": ".job-title", "location_selector": ".job-location"})
+
+    start = time.perf_counter()
+    out = scrape_from_config(config, max_workers=args.workers, per_host_delay=args.per_host_delay,
+                             parse_workers=args.parse_workers)
+    elapsed = time.perf_counter() - start
+    return {"targets": targets, "requests": fixtures.requests, "rows_out": len(out), "seconds": elapsed,
+            "rows_per_sec": len(out) / elapsed if elapsed else None, "latency": latency_summary(latencies)}
+
+
+def bench_discovery(rows, args, tmp):
+    fixtures, bases = _start_fixtures(args)
+    _point_automation_at(bases, tmp)
+    from automation.discovery import QueryCache, discover_companies
+    latencies = _record_latencies()
+
+    # One query per `max_per_query` rows, six query patterns per keyword
+    per_query = 20
+    keywords = [f"venue {i}" for i in range(max(1, rows // per_query // 6))]
+    start = time.perf_counter()
+    targets = discover_companies(keywords, [], max_per_query=per_query, cache=QueryCache(Path(tmp) / "cold.json"),
+                                 concurrency=args.workers, qps=args.discovery_qps)
+    elapsed = time.perf_counter() - start
+    queries = len(keywords) * 6
+    return {"queries": queries, "targets_out": len(targets), "seconds": elapsed,
+            "queries_per_sec": queries / elapsed if elapsed else None, "latency": latency_summary(latencies)}
+
+
+def _synthetic_csv(rows):
+    from automation.locations import guess_state
+    from bench.fixture_server import Fixtures
+    fixtures = Fixtures(jobs_per_target=100)
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(["company", "title", "location", "state", "source_url"])
+    for i in range(0, rows, 100):
+        for j, (title, loc) in enumerate(fixtures.jobs(f"co{i}")[:rows - i]):
+            w.writerow([f"Company {i // 100}", title, loc, guess_state(loc),
+                        f"https://example.com/co{i}/{j}"])
+    return buf.getvalue().encode("utf-8")
+
+
+def bench_backend(rows, args, tmp):
+    os.environ["JOBS_DB_PATH"] = str(Path(tmp) / "jobs.db")
+    sys.path.insert(0, str(ROOT / "backend"))
+    import app as backend
+    client = backend.app.test_client()
+
+    body = _synthetic_csv(rows)
+    start = time.perf_counter()
+    resp = client.post("/upload", data=body, content_type="text/csv")
+    ingest = time.perf_counter() - start
+    assert resp.status_code == 200, resp.data
+
+    queries = {
+        "jobs_full": ("/jobs", max(3, args.requests // 10)),
+        "jobs_page": ("/jobs?limit=100&offset={n}&sort=company", args.requests),
+        "jobs_state": ("/jobs?state=MI&limit=100", args.requests),
+        "jobs_title": ("/jobs?title=engineer&limit=100", args.requests),
+        "facets": ("/jobs/facets", args.requests),
+        "facets_state": ("/jobs/facets?state=IN", args.requests),
+    }
+    routes = {}
+    for name, (url, reps) in queries.items():
+        seconds = []
+        for n in range(reps):
+            t = time.perf_counter()
+            r = client.get(url.format(n=(n * 100) % max(1, rows)))
+            r.get_data()  # drain the streamed body
+            seconds.append(time.perf_counter() - t)
+        routes[name] = {**latency_summary(seconds), "req_per_sec": reps / sum(seconds)}
+    return {"ingest_seconds": ingest, "ingest_rows_per_sec": rows / ingest, "upload_bytes": len(body),
+            "routes": routes}
+
+
+def run_one(scenario, rows, args):
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        result = {"scenario": scenario, "rows": rows}
+        result.update({"scrape": bench_scrape, "discovery": bench_discovery, "backend": bench_backend}[scenario](
+            rows, args, tmp))
+    own, children = peak_rss_kb()
+    result.update({"peak_rss_kb": own, "children_peak_rss_kb": children})
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _headline(result):
+    """(throughput, p95 ms) used for run-to-run comparison."""
+    if result["scenario"] == "scrape":
+        return result["rows_per_sec"], result["latency"]["p95_ms"]
+    if result["scenario"] == "discovery":
+        return result["queries_per_sec"], result["latency"]["p95_ms"]
+    return result["ingest_rows_per_sec"], result["routes"]["jobs_page"]["p95_ms"]
+
+
+def compare(previous, current):
+    old = {(r["scenario"], r["rows"]): r for r in previous.get("results", [])}
+    print(f"{'scenario':<10} {'rows':>7} {'throughput':>18} {'p95 ms':>18} {'peak RSS MB':>18}", file=sys.stderr)
+    for r in current["results"]:
+        before = old.get((r["scenario"], r["rows"]))
+        tput, p95 = _headline(r)
+        rss = r["peak_rss_kb"] / 1024
+        if before is None:
+            print(f"{r['scenario']:<10} {r['rows']:>7} {tput:>18.1f} {p95 or 0:>18.2f} {rss:>18.1f}", file=sys.stderr)
+            continue
+        old_tput, old_p95 = _headline(before)
+        old_rss = before["peak_rss_kb"] / 1024
+        print(f"{r['scenario']:<10} {r['rows']:>7} {old_tput:>8.1f} -> {tput:<8.1f}"
+              f"{old_p95 or 0:>8.2f} -> {p95 or 0:<8.2f}{old_rss:>8.1f} -> {rss:<8.1f}", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Offline scraper/backend benchmarks against a local fixture server.")
+    p.add_argument("--scales", default="1000,10000,100000", help="comma-separated row counts")
+    p.add_argument("--scenarios", default=",".join(SCENARIOS), help="subset of: " + ", ".join(SCENARIOS))
+    p.add_argument("--out", help="write the JSON report here instead of stdout")
+    p.add_argument("--compare", help="previous JSON report to print a comparison against")
+    p.add_argument("--jobs-per-target", type=int, default=100, help="postings on each fixture board/page")
+    p.add_argument("--latency-ms", type=float, default=20, help="fixture server delay per request")
+    p.add_argument("--jitter-ms", type=float, default=10, help="extra random delay per request, up to this much")
+    p.add_argument("--pad-kb", type=float, default=50, help="script noise added to each generic page")
+    p.add_argument("--hosts", type=int, default=4, help="loopback addresses to serve on (separate host lanes)")
+    p.add_argument("--workers", type=int, default=8, help="fetch workers / discovery concurrency")
+    p.add_argument("--parse-workers", type=int, default=None, help="parse processes (default: one per core)")
+    p.add_argument("--per-host-delay", type=float, default=0.0, help="politeness delay between requests to a host")
+    p.add_argument("--discovery-qps", type=float, default=1000.0, help="token bucket rate for discovery")
+    p.add_argument("--requests", type=int, default=200, help="requests per backend route")
+    p.add_argument("--scenario", help=argparse.SUPPRESS)  # internal: run one scenario in this process
+    p.add_argument("--rows", type=int, help=argparse.SUPPRESS)
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+    if args.scenario:
+        print(json.dumps(run_one(args.scenario, args.rows, args)))
+        return
+
+    # Forward the tuning flags to each child, minus the ones that only matter here
+    passthrough, skip = [], False
+    for a in argv:
+        if skip:
+            skip = False
+            continue
+        if a.split("=")[0] in ("--scales", "--scenarios", "--out", "--compare"):
+            skip = "=" not in a
+            continue
+        passthrough.append(a)
+
+    report = {"meta": {"commit": _git_commit(), "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                       "python": platform.python_version(), "platform": platform.platform(),
+                       "cpu_count": os.cpu_count(), "args": vars(args)},
+              "results": []}
+    for rows in [int(s) for s in args.scales.split(",") if s.strip()]:
+        for scenario in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+            print(f"[BENCH] {scenario} @ {rows} rows...", file=sys.stderr)
+            proc = subprocess.run([sys.executable, "-m", "bench.run_bench", *passthrough,
+                                   "--scenario", scenario, "--rows", str(rows)],
+                                  cwd=ROOT, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(proc.stderr[-2000:], file=sys.stderr)
+                report["results"].append({"scenario": scenario, "rows": rows, "error": proc.returncode})
+                continue
+            report["results"].append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    data = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(data, encoding="utf-8")
+        print(f"[BENCH] Wrote {args.out}", file=sys.stderr)
+    else:
+        print(data)
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")),
+                {"results": [r for r in report["results"] if "error" not in r]})
+
+
+if __name__ == "__main__":
+    main()
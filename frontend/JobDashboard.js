@@ -1,20 +1,36 @@
 // frontend/JobDashboard.js
 export default function JobDashboard() {
   const { useEffect, useState } = React;
+  const PAGE_SIZE = 100;
   const [jobs, setJobs] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [offset, setOffset] = useState(0);
   const [filter, setFilter] = useState({ company: '', state: '', title: '' });
   const [uploading, setUploading] = useState(false);
 
+  // Filtering, sorting and paging happen server-side; we only fetch the page we show
   async function fetchJobs() {
     try {
-      const res = await axios.get(`${API}/jobs`);
+      const params = { limit: PAGE_SIZE, offset, sort: 'company' };
+      Object.entries(filter).forEach(([k, v]) => { if (v.trim()) params[k] = v.trim(); });
+      const res = await axios.get(`${API}/jobs`, { params });
       setJobs(res.data);
+      setTotal(Number(res.headers['x-total-count'] || res.data.length));
     } catch (e) {
       console.error('Fetch jobs failed', e);
     }
   }
 
-  useEffect(() => { fetchJobs(); }, []);
+  // Debounce so typing in a filter box doesn't fire a request per keystroke
+  useEffect(() => {
+    const t = setTimeout(fetchJobs, 250);
+    return () => clearTimeout(t);
+  }, [filter, offset]);
+
+  function updateFilter(key, value) {
+    setOffset(0);
+    setFilter(f => ({ ...f, [key]: value }));
+  }
 
   async function handleUpload(e) {
     const file = e.target.files?.[0];
@@ -32,27 +48,21 @@ export default function JobDashboard() {
     }
   }
 
-  const filtered = jobs.filter(j =>
-    (j.company || '').toLowerCase().includes(filter.company.toLowerCase()) &&
-    (j.state || '').toLowerCase().includes(filter.state.toLowerCase()) &&
-    (j.title || '').toLowerCase().includes(filter.title.toLowerCase())
-  );
-
   return React.createElement('div', { style: { padding: 20 } },
     React.createElement('h2', null, 'Career Scraper Dashboard'),
 
     React.createElement('div', { style: { display: 'flex', gap: 8, flexWrap: 'wrap', marginBottom: 12 } },
       React.createElement('input', {
-        placeholder: 'Filter by company',
-        onChange: e => setFilter(f => ({ ...f, company: e.target.value }))
+        placeholder: 'Company (exact)',
+        onChange: e => updateFilter('company', e.target.value)
       }),
       React.createElement('input', {
-        placeholder: 'Filter by state',
-        onChange: e => setFilter(f => ({ ...f, state: e.target.value }))
+        placeholder: 'State (e.g. MI)',
+        onChange: e => updateFilter('state', e.target.value)
       }),
       React.createElement('input', {
-        placeholder: 'Filter by title',
-        onChange: e => setFilter(f => ({ ...f, title: e.target.value }))
+        placeholder: 'Title contains',
+        onChange: e => updateFilter('title', e.target.value)
       }),
       React.createElement('input', { type: 'file', accept: '.csv', onChange: handleUpload }),
       uploading && React.createElement('span', null, 'Uploading...')
@@ -68,7 +78,7 @@ export default function JobDashboard() {
         )
       ),
       React.createElement('tbody', null,
-        filtered.map((j, i) =>
+        jobs.map((j, i) =>
           React.createElement('tr', { key: i },
             React.createElement('td', null, j.company),
             React.createElement('td', null, j.title),
@@ -79,6 +89,19 @@ export default function JobDashboard() {
       )
     ),
 
+    React.createElement('div', { style: { display: 'flex', gap: 8, alignItems: 'center', marginTop: 12 } },
+      React.createElement('button', {
+        disabled: offset === 0,
+        onClick: () => setOffset(o => Math.max(0, o - PAGE_SIZE))
+      }, 'Prev'),
+      React.createElement('span', null,
+        total ? `${offset + 1}-${offset + jobs.length} of ${total}` : 'No jobs'),
+      React.createElement('button', {
+        disabled: offset + PAGE_SIZE >= total,
+        onClick: () => setOffset(o => o + PAGE_SIZE)
+      }, 'Next')
+    ),
+
     React.createElement('div', { style: { marginTop: 12 } },
       React.createElement('a', {
         href: `${API}/download`,
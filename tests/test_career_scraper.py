@@ -0,0 +1,34 @@
+import pytest
+
+from automation.locations import normalize_location
+from career_scraper import state_of
+
+# The backend's state_of copies the runner's rules; both must agree on every row here
+STATES = [
+    ("Detroit, Michigan", "MI"),
+    ("Ann Arbor MI", "MI"),
+    ("Ann Arbor Michigan", "MI"),
+    ("Troy, MI (Hybrid)", "MI"),
+    ("US-MI-Detroit", "MI"),
+    ("Detroit, MI 48226", "MI"),
+    ("Columbus, OH - IN PERSON", "OH"),
+    ("Indianapolis, IN", "IN"),
+    ("Fort Wayne, Indiana or Remote", "IN"),
+    ("Charleston, West Virginia", "WV"),
+    ("Washington, D.C.", "DC"),
+    ("New York", "NY"),
+    ("Remote - US", ""),
+    ("Multiple Locations", ""),
+    ("", ""),
+]
+
+
+@pytest.mark.parametrize("text, state", STATES)
+def test_state_matches_the_runner(text, state):
+    assert state_of(text) == state
+    assert normalize_location(text).state == state
+
+
+def test_bare_city_needs_the_runners_gazetteer():
+    assert state_of("Kalamazoo") == ""
+    assert normalize_location("Kalamazoo").state == "MI"
@@ -0,0 +1,39 @@
+from automation.dedup import Deduplicator, canonical_url
+
+
+def _row(company, title, location, source_url, state=""):
+    return {"company": company, "title": title, "location": location, "state": state, "source_url": source_url}
+
+
+def test_same_posting_via_board_and_careers_page_collapses():
+    # Company labels exactly as discovery.discover_companies writes them
+    rows = [
+        _row("Acme Events (Greenhouse)", "Line Cook", "Detroit, MI", "https://boards.greenhouse.io/acmeevents/jobs/123"),
+        _row("www.acmeevents.com (Generic)", "Line Cook", "Detroit, Michigan", "https://www.acmeevents.com/careers"),
+        _row("Acme Events (Lever)", "Line Cook", "Detroit MI", "https://jobs.lever.co/acme-events/abc"),
+    ]
+    d = Deduplicator()
+    assert list(d.filter(rows)) == rows[:1]
+    assert (d.kept, d.dropped) == (1, 2)
+
+
+def test_distinct_jobs_on_one_generic_page_are_kept():
+    rows = [
+        _row("www.acme.com (Generic)", "Line Cook", "Detroit, MI", "https://www.acme.com/careers"),
+        _row("www.acme.com (Generic)", "Bartender", "Detroit, MI", "https://www.acme.com/careers"),
+        _row("www.acme.com (Generic)", "Line Cook", "Lansing, MI", "https://www.acme.com/careers"),
+    ]
+    assert len(list(Deduplicator().filter(rows))) == 3
+
+
+def test_different_companies_with_the_same_job_are_kept():
+    rows = [
+        _row("Acme (Greenhouse)", "Line Cook", "Detroit, MI", "https://boards.greenhouse.io/acme/jobs/1"),
+        _row("www.zenith.com (Generic)", "Line Cook", "Detroit, MI", "https://www.zenith.com/careers"),
+    ]
+    assert len(list(Deduplicator().filter(rows))) == 2
+
+
+def test_tracking_params_do_not_make_a_new_url():
+    assert canonical_url("HTTP://www.Acme.com/jobs/1/?utm_source=x&gh_src=y&id=2#apply") == \
+        canonical_url("https://acme.com/jobs/1?id=2")
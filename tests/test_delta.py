@@ -0,0 +1,59 @@
+import io
+import types
+
+from automation import daily_runner, delta
+from automation.scraper_core import write_csv
+from job_store import JobStore
+
+ROWS = [
+    {"company": " Acme Events ", "title": "Line  Cook", "location": "Detroit,  MI", "state": "MI",
+     "source_url": "https://jobs.lever.co/acme/1 "},
+    {"company": "ACME EVENTS", "title": "Bartender", "location": "", "state": "",
+     "source_url": "https://acme.example.com/careers"},
+    {"company": "Ford Field", "title": "Usher (Part-Time)", "location": "Detroit, Michigan", "state": "MI",
+     "source_url": ""},
+]
+
+
+def test_runner_and_backend_agree_on_fingerprints_and_digest(tmp_path):
+    out = tmp_path / "scraped_jobs.csv"
+    write_csv(ROWS, out)
+    store = JobStore(str(tmp_path / "jobs.db"))
+    upload = store.ingest(io.BytesIO(out.read_bytes()))
+    current = delta.build_snapshot(ROWS)
+    selection = store.select(fields=("fingerprint",))
+    try:
+        stored = {fp for batch in selection.batches() for (fp,) in batch}
+    finally:
+        selection.close()
+    assert stored == set(current)
+    assert upload["digest"] == delta.snapshot_digest(current)
+
+
+def _runner_with(monkeypatch, previous_rows, status):
+    posted = []
+    previous = delta.build_snapshot(previous_rows)
+    monkeypatch.setattr(daily_runner, "load_snapshot",
+                        lambda: {"digest": delta.snapshot_digest(previous), "jobs": previous})
+
+    def fake_upload_delta(*args):
+        posted.append(args)
+        return types.SimpleNamespace(status_code=status, ok=200 <= status < 300, text="{}")
+
+    monkeypatch.setattr(daily_runner, "upload_delta", fake_upload_delta)
+    return posted
+
+
+def test_unchanged_snapshot_posts_nothing(monkeypatch):
+    posted = _runner_with(monkeypatch, ROWS, 200)
+    assert daily_runner.sync_delta(delta.build_snapshot(ROWS)) is True
+    assert posted == []
+
+
+def test_any_delta_error_falls_back_to_a_full_upload(monkeypatch):
+    for status in (400, 404, 405, 409, 500, 503):
+        posted = _runner_with(monkeypatch, ROWS[:2], status)
+        assert daily_runner.sync_delta(delta.build_snapshot(ROWS)) is False
+        assert len(posted) == 1
+    posted = _runner_with(monkeypatch, ROWS[:2], 200)
+    assert daily_runner.sync_delta(delta.build_snapshot(ROWS)) is True
@@ -0,0 +1,30 @@
+from automation import discovery
+
+
+def _backend(tag, calls):
+    def search(query, count):
+        calls.append(query)
+        return [{"name": tag, "url": f"https://{tag}.example.com/careers", "snippet": ""}]
+    return search
+
+
+def test_cached_results_are_kept_per_backend_and_endpoint(monkeypatch, tmp_path):
+    cache_path = tmp_path / "search_cache.json"
+    real, stub = [], []
+    monkeypatch.setattr(discovery, "SEARCH_BACKENDS", {"bing": _backend("real", real)})
+    first = discovery.discover_companies(["arena"], cache=discovery.QueryCache(cache_path), qps=1000)
+    assert {e["url"] for e in first} == {"https://real.example.com/careers"}
+
+    # Same queries against a stub endpoint: nothing from the real run may be served
+    monkeypatch.setattr(discovery, "BING_ENDPOINT", "http://127.0.0.1:9/v7.0/search")
+    monkeypatch.setattr(discovery, "SEARCH_BACKENDS", {"bing": _backend("stub", stub)})
+    second = discovery.discover_companies(["arena"], cache=discovery.QueryCache(cache_path), qps=1000)
+    assert {e["url"] for e in second} == {"https://stub.example.com/careers"}
+    assert len(stub) == len(real) == 6
+
+    # ...and a custom backend function has its own entries too
+    other = []
+    third = discovery.discover_companies(["arena"], search=_backend("other", other),
+                                         cache=discovery.QueryCache(cache_path), qps=1000)
+    assert {e["url"] for e in third} == {"https://other.example.com/careers"}
+    assert len(other) == 6
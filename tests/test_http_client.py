@@ -0,0 +1,51 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from automation import http_client
+
+
+@pytest.fixture
+def throttled():
+    """Answers 429 with Retry-After: 3 to the first request and 200 to the rest."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            hits.append(self.path)
+            status = 429 if len(hits) == 1 else 200
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "3")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved = dict(http_client.SETTINGS)
+    yield f"http://127.0.0.1:{server.server_address[1]}/jobs", hits
+    server.shutdown()
+    http_client.configure(**saved)
+
+
+def test_retry_after_is_capped_by_max_retry_after(throttled):
+    url, hits = throttled
+    http_client.configure(retries=2, max_retry_after=0.2)
+    started = time.perf_counter()
+    response = http_client.get(url)
+    assert response.status_code == 200
+    assert len(hits) == 2
+    assert time.perf_counter() - started < 2
+
+
+def test_retry_keeps_its_cap_when_incremented():
+    retry = http_client._Retry(total=3, max_retry_after=0.5)
+    assert retry.increment(method="GET", url="/").max_retry_after == 0.5
@@ -0,0 +1,52 @@
+import io
+
+from job_store import HEAD_BYTES, JobStore, iter_jobs, source_type
+
+
+def _crlf_without_header(cut_between_cr_and_lf):
+    line = "Acme Events,Line Cook,Detroit MI,MI,https://acme.example.com/careers\r\n"
+    n = HEAD_BYTES // len(line) + 50
+    data = line * n
+    if cut_between_cr_and_lf:
+        # Pad the first line so the head block ends on the '\r' of a '\r\n'
+        k = HEAD_BYTES // len(line) - 1
+        first = line.replace("Line Cook", "Line Cook" + "x" * (HEAD_BYTES + 1 - k * len(line) - len(line)), 1)
+        data = first + line * (n - 1)
+        assert data[HEAD_BYTES - 1:HEAD_BYTES + 1] == "\r\n"
+    return data, n
+
+
+def test_crlf_split_at_the_head_boundary_adds_no_empty_row():
+    for cut in (False, True):
+        data, n = _crlf_without_header(cut)
+        jobs = list(iter_jobs(io.StringIO(data, newline="")))
+        assert len(jobs) == n
+        assert all(company and title for company, title, *_ in jobs)
+
+
+def test_legacy_import_if_empty_runs_once(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    legacy = b"company,title,location,state\nAcme Events,Line Cook,Detroit MI,MI\n"
+    assert store.ingest(io.BytesIO(legacy), if_empty=True) is not None
+    # A second worker starting up finds the upload and leaves it alone
+    assert store.ingest(io.BytesIO(b"company,title\nOther,Bartender\n"), if_empty=True) is None
+    selection = store.select(fields=("title",))
+    try:
+        assert [row for batch in selection.batches() for row in batch] == [("Line Cook",)]
+    finally:
+        selection.close()
+    assert store.latest()["rows"] == 1
+
+
+def test_malformed_source_url_is_unknown_not_an_error(tmp_path):
+    assert source_type("http://[broken/jobs") == "unknown"
+    assert source_type("https://boards.greenhouse.io/acme/jobs/1") == "greenhouse"
+    store = JobStore(str(tmp_path / "jobs.db"))
+    upload = store.ingest(io.BytesIO(
+        b"company,title,location,state,source_url\n"
+        b"Acme Events,Line Cook,Detroit MI,MI,http://[broken/jobs\n"
+        b"Acme Events,Bartender,Detroit MI,MI,https://jobs.lever.co/acme/1\n"))
+    assert upload["rows"] == 2
+    store.apply_delta(upload["digest"], [{"company": "Acme Events", "title": "Usher", "location": "Troy MI",
+                                          "state": "MI", "source_url": "http://[broken/usher"}], [])
+    assert store.latest()["rows"] == 3
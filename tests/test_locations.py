@@ -0,0 +1,41 @@
+import pytest
+
+from automation.locations import Location, guess_state, normalize_location, normalize_locations
+
+CASES = [
+    ("Detroit, Michigan", Location("Detroit", "MI", False)),
+    ("Detroit, MI", Location("Detroit", "MI", False)),
+    ("Ann Arbor MI", Location("Ann Arbor", "MI", False)),
+    ("Ann Arbor Michigan", Location("Ann Arbor", "MI", False)),
+    ("Troy, MI (Hybrid)", Location("Troy", "MI", False)),
+    ("US-MI-Detroit", Location("Detroit", "MI", False)),
+    ("Detroit, MI 48226", Location("Detroit", "MI", False)),
+    ("Grand Rapids, MI 49503-1234", Location("Grand Rapids", "MI", False)),
+    ("Remote - US", Location("", "", True)),
+    ("Remote (Michigan)", Location("", "MI", True)),
+    ("Indianapolis, IN or Remote", Location("Indianapolis", "IN", True)),
+    ("Michigan", Location("", "MI", False)),
+    ("Washington, D.C.", Location("Washington", "DC", False)),
+    # City only: the gazetteer fills in the state...
+    ("Kalamazoo", Location("Kalamazoo", "MI", False)),
+    ("Lansing", Location("Lansing", "MI", False)),
+    # ...unless the city exists in several states, which is left blank rather than guessed
+    ("Springfield", Location("Springfield", "", False)),
+    ("Columbus", Location("Columbus", "", False)),
+    # An explicit state beats the gazetteer
+    ("Columbus, OH", Location("Columbus", "OH", False)),
+    ("Portland, ME", Location("Portland", "ME", False)),
+    ("Multiple Locations", Location("", "", False)),
+    ("", Location("", "", False)),
+]
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+def test_normalize_location(text, expected):
+    assert normalize_location(text) == expected
+
+
+def test_bulk_and_guess_state_agree_with_single_calls():
+    texts = [text for text, _ in CASES] * 3
+    assert normalize_locations(texts) == [normalize_location(t) for t in texts]
+    assert [guess_state(t) for t in texts] == [loc.state for loc in normalize_locations(texts)]
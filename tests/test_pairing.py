@@ -0,0 +1,75 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from automation.scraper_adapters import pair_locations, parse_generic_page
+
+CARDS = """
+<div class="job"><h3>Line Cook</h3><span class="loc">Detroit, MI</span></div>
+<div class="job"><h3>Bartender</h3></div>
+<div class="job"><h3>Usher</h3><p><span class="loc">Troy, MI</span></p></div>
+"""
+# Location ahead of the title inside each card: order pairing would shift everything by one
+LOCATION_FIRST = """
+<ul>
+  <li><span class="loc">Detroit, MI</span><a>Line Cook</a></li>
+  <li><span class="loc">Indianapolis, IN</span><a>Bartender</a></li>
+</ul>
+"""
+# Titles and locations as siblings: no posting container to go by
+FLAT = """
+<ul>
+  <li class="t">Line Cook</li><li class="l">Detroit, MI</li>
+  <li class="t">Bartender</li>
+  <li class="t">Usher</li><li class="l">Troy, MI</li>
+</ul>
+"""
+# Two separate lists, meant to be read side by side
+COLUMNS = """
+<table><tr><td class="t">Line Cook</td><td class="t">Bartender</td><td class="t">Usher</td></tr>
+<tr><td class="l">Detroit, MI</td><td class="l">Troy, MI</td></tr></table>
+"""
+
+
+def _pair(html, title_selector, location_selector, strategy):
+    soup = BeautifulSoup(html, "html.parser")
+    titles, locations = soup.select(title_selector), soup.select(location_selector)
+    return [None if loc is None else loc.get_text(strip=True)
+            for loc in pair_locations(soup, titles, locations, strategy)]
+
+
+def test_container_keeps_each_location_in_its_own_card():
+    assert _pair(CARDS, "h3", ".loc", "container") == ["Detroit, MI", None, "Troy, MI"]
+
+
+def test_container_handles_a_location_before_the_title():
+    assert _pair(LOCATION_FIRST, "a", ".loc", "container") == ["Detroit, MI", "Indianapolis, IN"]
+    assert _pair(LOCATION_FIRST, "a", ".loc", "order") == ["Indianapolis, IN", None]
+
+
+def test_flat_layout_falls_back_from_container_to_order():
+    expected = ["Detroit, MI", None, "Troy, MI"]
+    assert _pair(FLAT, ".t", ".l", "order") == expected
+    assert _pair(FLAT, ".t", ".l", "container") == expected
+
+
+def test_zip_pairs_by_index():
+    assert _pair(COLUMNS, ".t", ".l", "zip") == ["Detroit, MI", "Troy, MI", None]
+
+
+def test_titles_without_locations():
+    for strategy in ("container", "order", "zip"):
+        assert _pair(CARDS, "h3", ".nothing", strategy) == [None, None, None]
+    rows = parse_generic_page(CARDS, "https://acme.example.com/careers", "h3", ".nothing")
+    assert [(r["title"], r["location"], r["state"]) for r in rows] == [
+        ("Line Cook", "", ""), ("Bartender", "", ""), ("Usher", "", "")]
+
+
+@pytest.mark.parametrize("pairing", ["container", "order"])
+def test_parse_generic_page_pairs_and_fills_states(pairing):
+    rows = parse_generic_page(FLAT, "https://acme.example.com/careers", ".t", ".l", pairing=pairing)
+    assert [(r["title"], r["state"]) for r in rows] == [("Line Cook", "MI"), ("Bartender", ""), ("Usher", "MI")]
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        _pair(CARDS, "h3", ".loc", "nearest")
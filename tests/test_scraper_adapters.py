@@ -0,0 +1,134 @@
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+from automation import http_client, scraper_adapters as adapters, scraper_core
+from automation.http_cache import ResponseCache
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class StubServer:
+    """Serves recorded responses by path (query string included); anything else is a 404."""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub.requests.append(self.path)
+                status, ctype, body = stub.routes.get(self.path, (404, "text/plain", b"not found"))
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def serve(self, path, fixture, status=200):
+        ctype = "application/json" if fixture.endswith(".json") else "text/html; charset=utf-8"
+        self.routes[path] = (status, ctype, (FIXTURES / fixture).read_bytes())
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    server = StubServer()
+    # Board URLs on the stub stand in for boards.greenhouse.io / jobs.lever.co, so the HTML
+    # fallback is served locally too
+    monkeypatch.setattr(adapters, "ATS_PATTERNS", [
+        (re.compile(re.escape(server.base) + r"/boards/greenhouse/([^/?#]+)"), "greenhouse"),
+        (re.compile(re.escape(server.base) + r"/boards/lever/([^/?#]+)"), "lever"),
+    ])
+    monkeypatch.setattr(adapters, "GREENHOUSE_API", server.base + "/greenhouse/{slug}/jobs")
+    monkeypatch.setattr(adapters, "LEVER_API", server.base + "/lever/{slug}")
+    monkeypatch.setattr(adapters, "response_cache", ResponseCache(tmp_path / "http-cache"))
+    monkeypatch.setattr(http_client, "SETTINGS", {**http_client.SETTINGS, "retries": 0})
+    http_client.configure()
+    yield server
+    server.server.shutdown()
+    http_client.configure()
+
+
+def test_greenhouse_api(stub):
+    stub.serve("/greenhouse/acmeevents/jobs", "greenhouse_jobs.json")
+    rows, pending = adapters.fetch_greenhouse(stub.base + "/boards/greenhouse/acmeevents")
+    assert pending is None
+    assert rows == [
+        {"title": "Event Coordinator", "location": "Detroit, Michigan, United States", "state": "MI",
+         "source_url": "https://boards.greenhouse.io/acmeevents/jobs/4012345"},
+        {"title": "Marketing Manager", "location": "Remote - US", "state": "",
+         "source_url": "https://boards.greenhouse.io/acmeevents/jobs/4012399"},
+        {"title": "Stagehand (Seasonal)", "location": "", "state": "",
+         "source_url": "https://boards.greenhouse.io/acmeevents/jobs/4012500"},
+    ]
+
+
+def test_greenhouse_404_falls_back_to_board_html(stub):
+    board = stub.base + "/boards/greenhouse/acmeevents"
+    stub.serve("/boards/greenhouse/acmeevents", "greenhouse_board.html")
+    rows = adapters.scrape_greenhouse(board)
+    assert stub.requests[0] == "/greenhouse/acmeevents/jobs"
+    assert [(r["title"], r["state"], r["source_url"]) for r in rows] == [
+        ("Event Coordinator", "MI", stub.base + "/acmeevents/jobs/4012345"),
+        ("Box Office Associate", "IN", stub.base + "/acmeevents/jobs/4012777"),
+    ]
+
+
+def test_lever_pages_until_a_short_page(stub, monkeypatch):
+    monkeypatch.setattr(adapters, "LEVER_PAGE_SIZE", 2)
+    stub.serve("/lever/acme?mode=json&skip=0&limit=2", "lever_page1.json")
+    stub.serve("/lever/acme?mode=json&skip=2&limit=2", "lever_page2.json")
+    rows, pending = adapters.fetch_lever(stub.base + "/boards/lever/acme")
+    assert pending is None
+    assert [r["title"] for r in rows] == ["Line Cook", "Bartender", "Security Officer"]
+    assert [r["state"] for r in rows] == ["MI", "MI", "IN"]
+    assert len(stub.requests) == 2
+
+
+def test_lever_full_last_page_asks_once_more(stub, monkeypatch):
+    # Exactly LEVER_PAGE_SIZE postings: only an empty next page says there are no more
+    monkeypatch.setattr(adapters, "LEVER_PAGE_SIZE", 2)
+    stub.serve("/lever/acme?mode=json&skip=0&limit=2", "lever_page1.json")
+    stub.routes["/lever/acme?mode=json&skip=2&limit=2"] = (200, "application/json", b"[]")
+    rows, pending = adapters.fetch_lever(stub.base + "/boards/lever/acme")
+    assert pending is None
+    assert [r["title"] for r in rows] == ["Line Cook", "Bartender"]
+    assert [urlsplit(p).query for p in stub.requests] == ["mode=json&skip=0&limit=2", "mode=json&skip=2&limit=2"]
+
+
+def test_lever_non_list_payload_falls_back_to_board_html(stub):
+    stub.serve("/lever/acme?mode=json&skip=0&limit=100", "lever_not_found.json")
+    stub.serve("/boards/lever/acme", "lever_board.html")
+    rows = adapters.scrape_lever(stub.base + "/boards/lever/acme")
+    assert rows == [{"title": "Line Cook", "location": "Grand Rapids, MI", "state": "MI",
+                     "source_url": "https://jobs.lever.co/acme/7a1c0b2e-0001"}]
+
+
+def test_lever_404_falls_back_to_board_html(stub):
+    stub.serve("/boards/lever/acme", "lever_board.html")
+    rows = adapters.scrape_lever(stub.base + "/boards/lever/acme")
+    assert [r["title"] for r in rows] == ["Line Cook"]
+    assert stub.requests == ["/lever/acme?mode=json&skip=0&limit=100", "/boards/lever/acme"]
+
+
+def test_generic_pages_parse_in_worker_processes(stub):
+    stub.serve("/careers", "greenhouse_board.html")
+    config = [{"company": "Acme Events", "type": "generic", "url": stub.base + "/careers",
+               "title_selector": ".opening a", "location_selector": ".opening .location"}]
+    rows = scraper_core.scrape_from_config(config, per_host_delay=0, parse_workers=1, dedupe=False)
+    assert [(r["company"], r["title"], r["state"]) for r in rows] == [
+        ("Acme Events", "Event Coordinator", "MI"), ("Acme Events", "Box Office Associate", "IN")]
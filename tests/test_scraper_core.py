@@ -0,0 +1,27 @@
+from automation import scraper_core
+from automation.throttle import host_of
+
+
+def test_host_of_tolerates_malformed_urls():
+    assert host_of("https://Boards.Greenhouse.io/acme") == "boards.greenhouse.io"
+    assert host_of("http://[broken/jobs") == ""
+    assert host_of("") == ""
+
+
+def test_malformed_url_fails_only_its_own_target(monkeypatch):
+    def fake_fetch(entry):
+        if entry["url"].startswith("http://["):
+            raise ValueError("bad url")
+        return [{"title": "Line Cook", "location": "Detroit, MI", "state": "MI", "source_url": entry["url"]}], None
+
+    monkeypatch.setattr(scraper_core, "_fetch_target", fake_fetch)
+    config = [
+        {"company": "Bad", "type": "generic", "url": "http://[broken/jobs"},
+        {"company": "Acme Events", "type": "generic", "url": "https://acme.example.com/careers"},
+    ]
+    outcomes = []
+    rows = scraper_core.scrape_from_config(config, per_host_delay=0, parse_workers=0, dedupe=False,
+                                           on_result=lambda e, r, err: outcomes.append((e["company"], len(r), err)))
+    assert [r["company"] for r in rows] == ["Acme Events"]
+    assert sorted((c, n, type(err).__name__) for c, n, err in outcomes) == [
+        ("Acme Events", 1, "NoneType"), ("Bad", 0, "ValueError")]